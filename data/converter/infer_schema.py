@@ -1,5 +1,14 @@
 import pandas as pd
-from typing import Dict
+from typing import Dict, List
+
+# Range of a Postgres INTEGER (int4)
+INT4_MIN, INT4_MAX = -2 ** 31, 2 ** 31 - 1
+
+
+def _fits_int4(series: pd.Series) -> bool:
+    values = series.dropna()
+    return values.empty or (values.min() >= INT4_MIN and values.max() <= INT4_MAX)
+
 
 def infer_schema(df: pd.DataFrame) -> Dict[str, str]:
     schema = {}
@@ -12,7 +21,7 @@ def infer_schema(df: pd.DataFrame) -> Dict[str, str]:
         dtype = series.dtype
 
         if pd.api.types.is_integer_dtype(dtype):
-            schema[col] = "INTEGER"
+            schema[col] = "INTEGER" if _fits_int4(series) else "BIGINT"
         elif pd.api.types.is_float_dtype(dtype):
             schema[col] = "DOUBLE PRECISION"
         elif pd.api.types.is_bool_dtype(dtype):
@@ -23,3 +32,61 @@ def infer_schema(df: pd.DataFrame) -> Dict[str, str]:
             schema[col] = "TEXT"
 
     return schema
+
+
+def _fits(series: pd.Series, pg_type: str):
+    """
+    `series` converted for a column of `pg_type`, or None if it does not fit.
+    """
+    try:
+        if pg_type in ("INTEGER", "BIGINT"):
+            numeric = pd.to_numeric(series, errors="raise").astype("Int64")
+            if pg_type == "INTEGER" and not _fits_int4(numeric):
+                return None
+            return numeric
+        if pg_type == "DOUBLE PRECISION":
+            return pd.to_numeric(series, errors="raise").astype("float64")
+        if pg_type == "BOOLEAN":
+            values = series.dropna()
+            if pd.api.types.is_bool_dtype(series) or values.map(type).eq(bool).all():
+                return series
+            return None
+        if pg_type == "TIMESTAMP":
+            return pd.to_datetime(series, errors="raise")
+    except (ValueError, TypeError, OverflowError):
+        return None
+    return series
+
+
+# The next type a column tries when its values no longer fit; anything
+# not listed (and DOUBLE PRECISION) ends at TEXT, which fits everything.
+_WIDER = {"INTEGER": "BIGINT", "BIGINT": "DOUBLE PRECISION"}
+
+
+def conform_to_schema(df: pd.DataFrame, schema: Dict[str, str]) -> List[str]:
+    """
+    Convert the columns of a batch in place to the types in `schema` (as
+    inferred from an earlier sample). Columns whose values no longer fit
+    are widened one step at a time (INTEGER -> BIGINT -> DOUBLE PRECISION
+    -> TEXT) to the first type that holds them, in both `df` and `schema`;
+    their names are returned so the caller can widen the table column as
+    well. TEXT columns always come out as the `string` dtype, even in a
+    batch where they happen to be all null.
+    """
+    widened = []
+    for col, pg_type in schema.items():
+        original = pg_type
+        converted = None
+        while pg_type != "TEXT":
+            converted = _fits(df[col], pg_type)
+            if converted is not None:
+                break
+            pg_type = _WIDER.get(pg_type, "TEXT")
+
+        if pg_type == "TEXT":
+            converted = df[col].astype("string")
+        df[col] = converted
+        if pg_type != original:
+            schema[col] = pg_type
+            widened.append(col)
+    return widened
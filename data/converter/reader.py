@@ -1,6 +1,7 @@
 import pandas as pd
 from pathlib import Path
 from io import BytesIO
+from typing import BinaryIO, Iterator, Tuple
 
 
 class UnsupportedFileTypeError(Exception):
@@ -62,6 +63,42 @@ def read_file(file_input, override_filename: str = None) -> pd.DataFrame:
     return df
 
 
+def read_csv_stream(
+    file_obj: BinaryIO,
+    batch_rows: int,
+    sample_bytes: int,
+) -> Tuple[pd.DataFrame, Iterator[pd.DataFrame]]:
+    """
+    Parse a CSV incrementally.
+
+    Returns (sample, batches): `sample` holds the leading rows, at least
+    `sample_bytes` of parsed data (or the whole file), for type inference;
+    `batches` yields every row of the file, sample included, in DataFrames
+    of at most `batch_rows` rows. Only the sample and one batch are held
+    in memory at a time.
+    """
+    reader = pd.read_csv(file_obj, chunksize=batch_rows)
+    head, size = [], 0
+    for chunk in reader:
+        chunk.columns = [_normalize_col_name(str(col)) for col in chunk.columns]
+        head.append(chunk)
+        size += chunk.memory_usage(index=False, deep=True).sum()
+        if size >= sample_bytes:
+            break
+
+    sample = pd.concat(head, ignore_index=True) if len(head) > 1 else head[0]
+    columns = sample.columns
+
+    def batches() -> Iterator[pd.DataFrame]:
+        while head:
+            yield head.pop(0)
+        for chunk in reader:
+            chunk.columns = columns
+            yield chunk
+
+    return sample, batches()
+
+
 def _normalize_col_name(name: str) -> str:
     import re
     name = name.strip().lower()
@@ -1,4 +1,4 @@
-from fastapi import FastAPI, Depends, UploadFile, File, HTTPException, APIRouter, Form
+from fastapi import FastAPI, Depends, UploadFile, File, HTTPException, APIRouter, Form, Response, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import StreamingResponse, HTMLResponse, FileResponse
@@ -8,6 +8,8 @@ import bcrypt
 import time
 import json 
 import redis
+import asyncio
+import hashlib
 from uuid import uuid4
 from datetime import timedelta
 from contextlib import asynccontextmanager
@@ -16,17 +18,22 @@ from src.multi_agent_analyst.db.db_core import (
     engine, 
     get_conn, 
     create_table, 
-    copy_dataframe, 
+    drop_table,
+    copy_dataframe_batches, 
     register_data_source, 
-    ensure_schema
+    ensure_schema,
+    ensure_data_source_profiles,
+    get_agent_pool_stats
 )
 from psycopg2 import OperationalError
 from src.multi_agent_analyst.db.loaders import load_user_tables
-from src.multi_agent_analyst.utils.utils import object_store
+from src.multi_agent_analyst.utils.utils import object_store, async_object_store
+from src.multi_agent_analyst.utils import object_codecs
+from src.multi_agent_analyst.utils.object_cache import ObjectCache
 import numpy as np 
 
 from src.backend.langgraph_runner.executor import run_initial_graph, clarify_graph
-from data.converter.reader import read_file
+from data.converter.reader import read_file, read_csv_stream
 from data.converter.infer_schema import infer_schema
 from src.backend.auth import create_access_token, Token, get_current_user, CurrentUser
 from src.backend.storage.thread_store import RedisSessionStore, RedisThreadMeta
@@ -34,12 +41,31 @@ from src.multi_agent_analyst.db.conversation_store import ThreadConversationStor
 from src.backend.storage.redis_client import checkpointer
 from pydantic import BaseModel
 from src.backend.storage.execution_store import RedisExecutionStore
-from src.multi_agent_analyst.utils.utils import json_safe
+from src.backend.storage.query_cache import query_cache
+from src.multi_agent_analyst.utils.json_encoding import dumps, dumps_lines, frame_records
+from src.multi_agent_analyst.utils.profiling import TableProfiler
 
 conversation_store = ThreadConversationStore()
 MAX_CLARIFICATIONS = 3
 MESSAGE_LIMIT = 4
 QUOTA_WINDOW_SECONDS= 24 * 60 * 60
+NDJSON_BATCH_ROWS = 10_000
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+ARROW_BATCH_ROWS = 64_000
+# Larger Arrow bodies are streamed instead of rendered and cached.
+RENDERED_INLINE_MAX_BYTES = 8 * 1024 * 1024
+OBJECT_STORE_HOUSEKEEPING_SECONDS = 60
+
+async def object_store_housekeeping():
+    # Spill files outlive their Redis pointer, and views must be
+    # materialized before their parent expires; sweep both periodically.
+    while True:
+        try:
+            await asyncio.to_thread(object_store.purge_spilled)
+            await asyncio.to_thread(object_store.materialize_expiring_views)
+        except Exception as e:
+            print(f"⚠️ Object store housekeeping warning: {e}")
+        await asyncio.sleep(OBJECT_STORE_HOUSEKEEPING_SECONDS)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -49,9 +75,18 @@ async def lifespan(app: FastAPI):
         print("✅ LangGraph checkpointer indexes created")
     except Exception as e:
         print(f"⚠️ Checkpointer setup warning: {e}")
+
+    try:
+        ensure_data_source_profiles()
+    except Exception as e:
+        print(f"⚠️ data_sources profile column warning: {e}")
+
+    housekeeping_task = asyncio.create_task(object_store_housekeeping())
     
     yield
 
+    housekeeping_task.cancel()
+
 app = FastAPI(lifespan=lifespan)
 
 def check_postgres():
@@ -79,23 +114,23 @@ def check_checkpointer():
         return False
 
 
-def check_object_store():
+async def check_object_store():
     try:
         # Test save + read
-        obj_id = object_store.save({"health": "ok"})
-        _ = object_store.get(obj_id)
+        obj_id = await async_object_store.save({"health": "ok"})
+        _ = await async_object_store.get(obj_id)
         return True
     except Exception:
         return False
 
 
 @app.get("/api/health")
-def health_check():
+async def health_check():
     components = {
-        "postgres": "ok" if check_postgres() else "down",
-        "redis": "ok" if check_redis(redis_client) else "down",
+        "postgres": "ok" if await asyncio.to_thread(check_postgres) else "down",
+        "redis": "ok" if await asyncio.to_thread(check_redis, redis_client) else "down",
         "checkpointer": "ok" if check_checkpointer() else "down",
-        "object_store": "ok" if check_object_store() else "down",
+        "object_store": "ok" if await check_object_store() else "down",
     }
 
     if any(v == "down" for v in components.values()):
@@ -113,6 +148,15 @@ def health_check():
     }
 
 
+@app.get("/api/metrics")
+def metrics():
+    return {
+        "object_store": object_store.stats(),
+        "rendered_objects": rendered_objects.stats(),
+        "agent_pool": get_agent_pool_stats(),
+    }
+
+
 from src.backend.config import settings
 
 redis_client = redis.Redis(
@@ -122,6 +166,7 @@ redis_client = redis.Redis(
     decode_responses=True
 )
 session_store = RedisSessionStore(redis_client)
+rendered_objects = ObjectCache(settings.rendered_cache_max_bytes)
 thread_meta = RedisThreadMeta(redis_client)
 execution_store=RedisExecutionStore(redis_client)
 
@@ -132,6 +177,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Total-Count"],
 )
 
 app.mount("/static", StaticFiles(directory="src/frontend/static"), name="static")
@@ -221,19 +267,134 @@ async def handle_clarify(payload: dict, background_tasks: BackgroundTasks, user:
     return {"session_id": session_id, "status": "processing"}
 
 @app.get("/api/object/{object_id}")
-async def get_object(object_id: str):
-    obj = object_store.get(object_id)
+async def get_object(
+    object_id: str,
+    request: Request,
+    columns: str | None = None,
+    offset: int = 0,
+    limit: int | None = None,
+    stream: bool = False,
+):
+    """
+    Return a stored object. DataFrames can be paged with `offset`/`limit`,
+    projected with `columns`, and streamed as NDJSON row batches with
+    `stream=true`; X-Total-Count carries the full row count.
+
+    Clients that accept `application/vnd.apache.arrow.stream` get
+    DataFrames as an Arrow IPC stream read straight from the stored
+    columns, with no per-row Python objects.
+
+    Objects never change once saved, so every representation carries a
+    strong ETag and is cacheable for the object's remaining TTL; rendered
+    bodies are also kept in a process-local cache.
+    """
+    if offset < 0 or (limit is not None and limit < 0):
+        raise HTTPException(400, "offset and limit must be non-negative")
+
+    try:
+        meta = await async_object_store.get_meta(object_id)
+    except KeyError:
+        raise HTTPException(404, f"Object '{object_id}' not found")
+
+    is_frame = meta["kind"] == "dataframe"
+    column_list = columns.split(",") if columns else None
+    if is_frame and column_list is not None:
+        missing = [c for c in column_list if c not in meta["columns"]]
+        if missing:
+            raise HTTPException(400, f"Columns {missing} not found in object '{object_id}'")
+
+    if not is_frame:
+        fmt = "raw"
+    elif ARROW_STREAM_MEDIA_TYPE in request.headers.get("accept", ""):
+        fmt = "arrow"
+    elif stream:
+        fmt = "ndjson"
+    else:
+        fmt = "json"
+
+    variant = (object_id, fmt, columns, offset, limit)
+    ttl = await async_object_store.ttl(object_id)
+    headers = {
+        "ETag": object_etag(meta.get("content_hash") or object_id, variant[1:]),
+        "Cache-Control": f"private, max-age={max(ttl, 0)}, immutable",
+    }
+    if is_frame:
+        headers["X-Total-Count"] = str(meta["shape"][0])
+        headers["Vary"] = "Accept"
+
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+
+    cached = rendered_objects.get(variant)
+    if cached is not None:
+        body, media_type = cached
+        return Response(content=body, media_type=media_type, headers=headers)
+
+    rows = None
+    if is_frame and (offset or limit is not None):
+        rows = slice(offset, offset + limit if limit is not None else None)
+
+    if fmt == "arrow":
+        try:
+            table = await async_object_store.get_arrow(object_id, columns=column_list, rows=rows)
+        except KeyError as e:
+            raise HTTPException(404, str(e))
+        except TypeError:
+            # Stored through the pickle fallback; answer with JSON below,
+            # rendered and cached under the JSON variant.
+            table = None
+            variant = (object_id, "json", columns, offset, limit)
+        if table is not None:
+            table = table.drop_columns(object_codecs.index_columns(table.schema))
+            batches = object_codecs.iter_ipc_stream(table, ARROW_BATCH_ROWS)
+            if table.nbytes > RENDERED_INLINE_MAX_BYTES:
+                return StreamingResponse(batches, media_type=ARROW_STREAM_MEDIA_TYPE, headers=headers)
+            body = await asyncio.to_thread(b"".join, batches)
+            return cache_rendered(variant, body, ARROW_STREAM_MEDIA_TYPE, headers)
+
+    if fmt == "ndjson":
+        start, stop, _ = (rows or slice(None)).indices(meta["shape"][0])
+        return StreamingResponse(
+            iter_ndjson(object_id, column_list, start, stop),
+            media_type="application/x-ndjson",
+            headers=headers,
+        )
+
+    try:
+        obj = await async_object_store.get(object_id, columns=column_list, rows=rows)
+    except TypeError as e:
+        raise HTTPException(400, str(e))
+    except KeyError as e:
+        raise HTTPException(404, str(e))
 
     if hasattr(obj, "read"):
         obj.seek(0)
-        return StreamingResponse(obj, media_type="image/png")
+        return cache_rendered(variant, obj.read(), "image/png", headers)
 
-    if isinstance(obj, pd.DataFrame):
-        df = obj.replace([np.inf, -np.inf], np.nan)
-        records = df.to_dict(orient="records")
-        return json_safe(records)
+    body = await asyncio.to_thread(dumps, obj)
+    return cache_rendered(variant, body, "application/json", headers)
 
-    return json_safe(obj)
+def object_etag(base: str, variant) -> str:
+    digest = hashlib.blake2b(repr(variant).encode(), digest_size=8).hexdigest()
+    return f'"{base}-{digest}"'
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+def cache_rendered(variant, body: bytes, media_type: str, headers: dict) -> Response:
+    rendered_objects.put(variant, (body, media_type), len(body))
+    return Response(content=body, media_type=media_type, headers=headers)
+
+def iter_ndjson(object_id: str, columns, start: int, stop: int):
+    # Sync generator: Starlette iterates it in a worker thread. Each batch
+    # is read on its own, so chunked/spilled objects are never loaded whole.
+    for batch_start in range(start, stop, NDJSON_BATCH_ROWS):
+        batch_stop = min(batch_start + NDJSON_BATCH_ROWS, stop)
+        df = object_store.get(object_id, columns=columns, rows=slice(batch_start, batch_stop))
+        yield dumps_lines(frame_records(df))
 
 @app.post("/api/upload_data")
 async def upload_data(file: UploadFile = File(...), user: CurrentUser = Depends(get_current_user)):
@@ -243,12 +404,26 @@ async def upload_data(file: UploadFile = File(...), user: CurrentUser = Depends(
     if not (filename.endswith(".csv") or filename.endswith(".xlsx")):
         raise HTTPException(status_code=400, detail="Only CSV and XLSX accepted")
 
-    raw = await file.read()
-    df = read_file(io.BytesIO(raw), override_filename=filename)
-    if df.empty:
-        raise HTTPException(status_code=400, detail="File is empty")
+    if filename.endswith(".csv"):
+        # Parse the (spooled) upload in batches; types come from the first
+        # UPLOAD_INFER_MB of rows and batches are COPYed as they are parsed.
+        try:
+            sample, batches = read_csv_stream(file.file, settings.upload_batch_rows, settings.upload_infer_bytes)
+        except pd.errors.EmptyDataError:
+            raise HTTPException(status_code=400, detail="File is empty")
+        if sample.empty:
+            raise HTTPException(status_code=400, detail="File is empty")
+        schema_dict = infer_schema(sample)
+        del sample
+    else:
+        raw = await file.read()
+        df = read_file(io.BytesIO(raw), override_filename=filename)
+        if df.empty:
+            raise HTTPException(status_code=400, detail="File is empty")
+        schema_dict = infer_schema(df)
+        batches = [df]
+        del raw, df
 
-    schema_dict = infer_schema(df)
     table_name = filename.split(".")[0]
 
     # Use the pool-safe context manager
@@ -263,14 +438,26 @@ async def upload_data(file: UploadFile = File(...), user: CurrentUser = Depends(
                 raise HTTPException(400, detail=f"Table '{table_name}' already exists.")
 
     ensure_schema(thread_id)
+    created = False
     try:
         create_table(thread_id, table_name, schema_dict)
-        copy_dataframe(thread_id, table_name, df)
-        source_id = register_data_source(thread_id=thread_id, table_name=table_name, filename=filename)
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
+        created = True
+        profiler = TableProfiler()
+        rows = copy_dataframe_batches(thread_id, table_name, batches, schema_dict, on_batch=profiler.update)
+        source_id = register_data_source(thread_id=thread_id, table_name=table_name, filename=filename, profile=profiler.result())
+    except Exception as e:
+        # Don't leave an empty table behind: retrying the upload would
+        # fail with "already exists"
+        if created:
+            drop_table(thread_id, table_name)
+        if isinstance(e, ValueError):
+            raise HTTPException(status_code=400, detail=str(e))
+        raise
+    finally:
+        # Cached SQL results for this thread may no longer be valid
+        query_cache.bump_version(thread_id)
     
-    return {"status": "success", "rows": len(df), "table_name": table_name}
+    return {"status": "success", "rows": rows, "table_name": table_name}
 
 router = APIRouter(prefix="/api")
 
@@ -24,6 +24,15 @@ class Settings(BaseModel):
     data_agent_password : str
 
     database_url: str | None = None
+    sql_max_result_rows: int = 1_000_000
+    agent_pool_size: int = 10
+    agent_pool_max_overflow: int = 20
+
+    # ======================
+    # UPLOADS
+    # ======================
+    upload_batch_rows: int = 50_000
+    upload_infer_bytes: int = 8 * 1024 * 1024
 
     # ======================
     # REDIS
@@ -32,6 +41,26 @@ class Settings(BaseModel):
     redis_app_port: int = 6379
     redis_app_db: int = 0
 
+    # ======================
+    # OBJECT STORE
+    # ======================
+    object_cache_max_bytes: int = 256 * 1024 * 1024
+    object_chunk_threshold_bytes: int = 64 * 1024 * 1024
+    object_chunk_rows: int = 100_000
+    object_compress_min_bytes: int = 16 * 1024
+    object_content_addressing: bool = False
+    object_spill_threshold_bytes: int = 1024 * 1024 * 1024
+    object_spill_dir: str = "/tmp/object_spill"
+    rendered_cache_max_bytes: int = 64 * 1024 * 1024
+
+    # ======================
+    # VISUALIZATION
+    # ======================
+    viz_max_points: int = 5_000
+    viz_density_threshold_rows: int = 200_000
+    viz_density_grid_size: int = 100
+    viz_typed_arrays: bool = True
+
     # ======================
     # REDIS (LANGGRAPH)
     # ======================
@@ -70,11 +99,31 @@ def load_settings() -> Settings:
             database_url=os.getenv("DATABASE_URL"),
             agent_role_password=os.getenv("AGENT_ROLE_PASS"),
             data_agent_password=os.getenv("DATA_AGENT_PASSWORD"),
+            sql_max_result_rows=int(os.getenv("SQL_MAX_RESULT_ROWS", 1_000_000)),
+            agent_pool_size=int(os.getenv("AGENT_POOL_SIZE", 10)),
+            agent_pool_max_overflow=int(os.getenv("AGENT_POOL_MAX_OVERFLOW", 20)),
+
+            upload_batch_rows=int(os.getenv("UPLOAD_BATCH_ROWS", 50_000)),
+            upload_infer_bytes=int(os.getenv("UPLOAD_INFER_MB", 8)) * 1024 * 1024,
 
             redis_app_host=os.getenv("REDIS_APP_HOST", "localhost"),
             redis_app_port=int(os.getenv("REDIS_APP_PORT", 6379)),
             redis_app_db=int(os.getenv("REDIS_APP_DB", 0)),
 
+            object_cache_max_bytes=int(os.getenv("OBJECT_CACHE_MAX_MB", 256)) * 1024 * 1024,
+            object_chunk_threshold_bytes=int(os.getenv("OBJECT_CHUNK_THRESHOLD_MB", 64)) * 1024 * 1024,
+            object_chunk_rows=int(os.getenv("OBJECT_CHUNK_ROWS", 100_000)),
+            object_compress_min_bytes=int(os.getenv("OBJECT_COMPRESS_MIN_KB", 16)) * 1024,
+            object_content_addressing=os.getenv("OBJECT_CONTENT_ADDRESSING", "false").lower() == "true",
+            object_spill_threshold_bytes=int(os.getenv("OBJECT_SPILL_THRESHOLD_MB", 1024)) * 1024 * 1024,
+            object_spill_dir=os.getenv("OBJECT_SPILL_DIR", "/tmp/object_spill"),
+            rendered_cache_max_bytes=int(os.getenv("RENDERED_CACHE_MAX_MB", 64)) * 1024 * 1024,
+
+            viz_max_points=int(os.getenv("VIZ_MAX_POINTS", 5_000)),
+            viz_density_threshold_rows=int(os.getenv("VIZ_DENSITY_THRESHOLD_ROWS", 200_000)),
+            viz_density_grid_size=int(os.getenv("VIZ_DENSITY_GRID_SIZE", 100)),
+            viz_typed_arrays=os.getenv("VIZ_TYPED_ARRAYS", "true").lower() == "true",
+
             redis_checkpointer_host=os.getenv("REDIS_CHECKPOINTER_HOST", "localhost"),
             redis_checkpointer_port=int(os.getenv("REDIS_CHECKPOINTER_PORT", 6380)),
             redis_checkpointer_db=0, 
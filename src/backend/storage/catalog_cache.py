@@ -0,0 +1,46 @@
+from typing import Optional
+
+import redis
+
+from src.backend.storage.redis_client import redis_client
+from src.backend.storage.query_cache import RedisQueryCache, query_cache
+from src.multi_agent_analyst.utils.json_encoding import dumps, loads
+
+CATALOG_TTL = 24 * 3600
+
+
+class RedisCatalogCache:
+    """
+    Cache of `load_user_tables` output per thread.
+
+    Entries are keyed by the thread's data version (shared with the SQL
+    result cache), so anything that writes to the thread schema and bumps
+    the version invalidates both.
+
+    Redis schema:
+      catalog:{thread_id}:{version} -> JSON {available_tables, tables}
+    """
+
+    def __init__(self, redis_client: redis.Redis, versions: RedisQueryCache):
+        self.r = redis_client
+        self.versions = versions
+
+    def _key(self, thread_id: str, version: int) -> str:
+        return f"catalog:{thread_id}:{version}"
+
+    def data_version(self, thread_id: str) -> int:
+        return self.versions.data_version(thread_id)
+
+    def get(self, thread_id: str, version: int) -> Optional[dict]:
+        raw = self.r.get(self._key(thread_id, version))
+        return loads(raw) if raw is not None else None
+
+    def put(self, thread_id: str, version: int, catalog: dict) -> None:
+        """
+        `version` must be read before the catalog was built, so a catalog
+        that raced with an upload is stored under the old version.
+        """
+        self.r.set(self._key(thread_id, version), dumps(catalog), ex=CATALOG_TTL)
+
+
+catalog_cache = RedisCatalogCache(redis_client, query_cache)
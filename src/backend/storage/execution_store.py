@@ -1,10 +1,11 @@
 from __future__ import annotations
 
 import time
-import json
 from typing import Optional, Dict, Any
 import redis
 
+from src.multi_agent_analyst.utils.json_encoding import dumps, loads
+
 
 class RedisExecutionStore:
     """
@@ -42,7 +43,7 @@ class RedisExecutionStore:
         if value is None:
             return ""
         if isinstance(value, (dict, list)):
-            return json.dumps(value)
+            return dumps(value).decode()
         return str(value)
 
     # ---------- lifecycle ----------
@@ -84,7 +85,7 @@ class RedisExecutionStore:
             return None
 
         seq = int(next_seq)
-        milestones = json.loads(milestones_json or "[]")
+        milestones = loads(milestones_json or "[]")
 
         milestones.append(
             {
@@ -97,7 +98,7 @@ class RedisExecutionStore:
         self.r.hset(
             key,
             mapping={
-                "milestones": json.dumps(milestones),
+                "milestones": dumps(milestones),
                 "next_seq": seq + 1,
                 "updated_at": now,
             },
@@ -176,7 +177,7 @@ class RedisExecutionStore:
         if not data:
             return None
 
-        milestones = json.loads(data.get("milestones", "[]"))
+        milestones = loads(data.get("milestones", "[]"))
         new_milestones = [m for m in milestones if m["seq"] > after_seq]
 
         return {
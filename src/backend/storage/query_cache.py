@@ -0,0 +1,77 @@
+import hashlib
+import re
+from typing import Optional
+
+import redis
+
+from src.backend.storage.redis_client import redis_client
+from src.multi_agent_analyst.utils.json_encoding import dumps, loads
+
+# Quoted literals / identifiers are kept verbatim; everything else is
+# case- and whitespace-insensitive in Postgres.
+_QUOTED = re.compile(r"""('(?:[^']|'')*'|"(?:[^"]|"")*")""")
+
+
+def normalize_sql(sql: str) -> str:
+    parts = _QUOTED.split(sql.strip().rstrip(";").strip())
+    return "".join(
+        part if i % 2 else re.sub(r"\s+", " ", part).lower()
+        for i, part in enumerate(parts)
+    )
+
+
+class RedisQueryCache:
+    """
+    Cache of SQL results per thread.
+
+    Maps (thread, data version, normalized SQL) -> object_id of the stored
+    result, plus the row cap it was truncated at (None if complete). The
+    data version is a per-thread counter bumped whenever the thread's
+    schema is written to, so older entries simply stop matching and
+    expire on their own.
+
+    Redis schema:
+      thread:{thread_id}:data_version              -> int
+      sqlcache:{thread_id}:{version}:{sql_digest}  -> JSON {object_id, truncated_at}
+    """
+
+    def __init__(self, redis_client: redis.Redis):
+        self.r = redis_client
+
+    def _version_key(self, thread_id: str) -> str:
+        return f"thread:{thread_id}:data_version"
+
+    def _entry_key(self, thread_id: str, version: int, sql: str) -> str:
+        digest = hashlib.sha1(normalize_sql(sql).encode()).hexdigest()
+        return f"sqlcache:{thread_id}:{version}:{digest}"
+
+    def data_version(self, thread_id: str) -> int:
+        return int(self.r.get(self._version_key(thread_id)) or 0)
+
+    def bump_version(self, thread_id: str) -> int:
+        return int(self.r.incr(self._version_key(thread_id)))
+
+    def get(self, thread_id: str, version: int, sql: str) -> Optional[dict]:
+        raw = self.r.get(self._entry_key(thread_id, version, sql))
+        if raw is None:
+            return None
+        return loads(raw)
+
+    def put(
+        self,
+        thread_id: str,
+        version: int,
+        sql: str,
+        object_id: str,
+        ttl: int,
+        truncated_at: Optional[int] = None,
+    ) -> None:
+        """
+        `version` must be read before the query ran, so a result that
+        raced with an upload is stored under the old version.
+        """
+        entry = {"object_id": object_id, "truncated_at": truncated_at}
+        self.r.set(self._entry_key(thread_id, version, sql), dumps(entry), ex=ttl)
+
+
+query_cache = RedisQueryCache(redis_client)
@@ -1,4 +1,6 @@
 const API_BASE = "/api";
+const TABLE_PAGE_SIZE = 100;
+const ARROW_STREAM_TYPE = "application/vnd.apache.arrow.stream";
 let waitingForClarification = false;
 
 const PUBLIC_PAGES = [
@@ -368,7 +370,11 @@ async function renderFinalArtifactIfAny(snap) {
             const tableData = Array.isArray(objectResult.data)
                 ? objectResult.data
                 : (objectResult.data.data || []);
-            addDataTable(tableData, snap.final_table_shape || {});
+            addDataTable(tableData, snap.final_table_shape || {}, {
+                objId: snap.final_obj_id,
+                total: objectResult.total,
+                offset: 0,
+            });
         }
     } catch (e) {
         console.error("Artifact render failed:", e);
@@ -624,9 +630,9 @@ function addMessage(text, sender) {
     messagesDiv.appendChild(wrapper);
     scrollToBottom();
 }
-function addDataTable(data, metadata = {}) {
+function addDataTable(data, metadata = {}, pager = null) {
 
-    const MAX_ROWS = 100; 
+    const MAX_ROWS = TABLE_PAGE_SIZE; 
     
     const wrapper = document.createElement("div");
     wrapper.classList.add("message", "bot", "data-message");
@@ -666,19 +672,15 @@ function addDataTable(data, metadata = {}) {
 
 
         const tbody = document.createElement("tbody");
-        displayData.forEach(row => {
-            const tr = document.createElement("tr");
-            keys.forEach(key => {
-                const td = document.createElement("td");
-                td.textContent = row[key] !== null ? row[key] : "-";
-                tr.appendChild(td);
-            });
-            tbody.appendChild(tr);
-        });
+        fillTableBody(tbody, keys, displayData);
         table.appendChild(tbody);
         tableContainer.appendChild(table);
         content.appendChild(tableContainer);
 
+        // Page through large results on the server instead of loading them whole
+        if (pager && pager.total > MAX_ROWS) {
+            content.appendChild(createTablePager(pager, tbody, keys));
+        }
 
     } else {
         content.textContent = "No displayable data found.";
@@ -690,6 +692,58 @@ function addDataTable(data, metadata = {}) {
     scrollToBottom();
 }
 
+function fillTableBody(tbody, keys, rows) {
+    tbody.innerHTML = "";
+    rows.forEach(row => {
+        const tr = document.createElement("tr");
+        keys.forEach(key => {
+            const td = document.createElement("td");
+            td.textContent = row[key] !== null && row[key] !== undefined ? row[key] : "-";
+            tr.appendChild(td);
+        });
+        tbody.appendChild(tr);
+    });
+}
+
+function createTablePager(pager, tbody, keys) {
+    const controls = document.createElement("div");
+    controls.className = "table-pager";
+
+    const prevBtn = document.createElement("button");
+    prevBtn.textContent = "‹ Prev";
+    const nextBtn = document.createElement("button");
+    nextBtn.textContent = "Next ›";
+    const label = document.createElement("span");
+
+    let offset = pager.offset || 0;
+
+    const update = () => {
+        const last = Math.min(offset + TABLE_PAGE_SIZE, pager.total);
+        label.textContent = `Rows ${offset + 1}–${last} of ${pager.total}`;
+        prevBtn.disabled = offset === 0;
+        nextBtn.disabled = last >= pager.total;
+    };
+
+    const goTo = async (newOffset) => {
+        prevBtn.disabled = nextBtn.disabled = true;
+        const result = await fetchObjectData(pager.objId, newOffset);
+        if (result && Array.isArray(result.data)) {
+            offset = newOffset;
+            fillTableBody(tbody, keys, result.data);
+        }
+        update();
+    };
+
+    prevBtn.addEventListener("click", () => goTo(Math.max(offset - TABLE_PAGE_SIZE, 0)));
+    nextBtn.addEventListener("click", () => goTo(offset + TABLE_PAGE_SIZE));
+
+    controls.appendChild(prevBtn);
+    controls.appendChild(label);
+    controls.appendChild(nextBtn);
+    update();
+    return controls;
+}
+
 function addImage(base64OrBlob) {
     const wrapper = document.createElement("div");
     wrapper.classList.add("message", "bot", "image-message");
@@ -714,10 +768,46 @@ function addImage(base64OrBlob) {
     messagesDiv.appendChild(wrapper);
     scrollToBottom();
 }
+function base64ToBuffer(b64) {
+    const binary = atob(b64);
+    const bytes = new Uint8Array(binary.length);
+    for (let i = 0; i < binary.length; i++) bytes[i] = binary.charCodeAt(i);
+    return bytes.buffer;
+}
+
+function decodeSeries(value) {
+    // Typed-array encoded series from the server (see utils/typed_arrays.py)
+    if (!value || Array.isArray(value) || typeof value !== "object" || !value.dtype) return value;
+
+    switch (value.dtype) {
+        case "float64":
+            return new Float64Array(base64ToBuffer(value.data));
+        case "int32":
+            return new Int32Array(base64ToBuffer(value.data));
+        case "datetime_ms":
+            return Array.from(new Float64Array(base64ToBuffer(value.data)),
+                // Naive wall-clock string, as Plotly expects (drop the "Z")
+                ms => Number.isNaN(ms) ? null : new Date(ms).toISOString().slice(0, -1));
+        case "category":
+            return Array.from(new Int32Array(base64ToBuffer(value.codes)),
+                code => code < 0 ? null : value.categories[code]);
+        default:
+            return value;
+    }
+}
+
+function decodeSpec(vis) {
+    const spec = {};
+    for (const [key, value] of Object.entries(vis)) {
+        spec[key] = decodeSeries(value);
+    }
+    return spec;
+}
+
 function renderVisualization(vis) {
     console.log("VIS RECEIVED:", vis);
 
-    const spec = vis;
+    const spec = decodeSpec(vis);
 
     const wrapper = document.createElement("div");
     wrapper.classList.add("message", "bot", "viz-message");
@@ -746,6 +836,26 @@ function renderVisualization(vis) {
 
 switch (spec.plot_type) {
     case "scatter":
+        // Binned on the server: one point per cell, shaded by how many rows it holds
+        if (spec.counts) {
+            plotData = [{
+                x: spec.x,
+                y: spec.y,
+                type: "scattergl",
+                mode: "markers",
+                text: spec.counts.map(c => `${c} rows`),
+                marker: {
+                    size: 6,
+                    color: spec.counts,
+                    colorscale: "Blues",
+                    reversescale: true,
+                    showscale: true,
+                    colorbar: { title: { text: "Rows" }, tickfont: { color: "#94a3b8" } },
+                    opacity: 0.85
+                }
+            }];
+            break;
+        }
         plotData = [{
             x: spec.x,
             y: spec.y,
@@ -781,6 +891,37 @@ switch (spec.plot_type) {
         break;
 
     case "histogram":
+        // Pre-binned on the server: draw the counts, don't re-bin
+        if (spec.bin_edges) {
+            const edges = spec.bin_edges;
+            if (spec.log_scale) {
+                plotData = [{
+                    x: edges,
+                    y: [...Array.from(spec.counts), spec.counts[spec.counts.length - 1]],
+                    type: "scatter",
+                    mode: "lines",
+                    line: { shape: "hv", color: "#3b82f6", width: 1 },
+                    fill: "tozeroy",
+                    fillcolor: "rgba(96, 165, 250, 0.6)"
+                }];
+            } else {
+                plotData = [{
+                    x: Array.from(spec.counts, (_, i) => (edges[i] + edges[i + 1]) / 2),
+                    y: spec.counts,
+                    width: Array.from(spec.counts, (_, i) => edges[i + 1] - edges[i]),
+                    type: "bar",
+                    marker: {
+                        color: "#60a5fa",
+                        line: {
+                            color: "#3b82f6",
+                            width: 1
+                        },
+                        opacity: 0.8
+                    }
+                }];
+            }
+            break;
+        }
         plotData = [{
             x: spec.x, 
             type: "histogram",
@@ -798,6 +939,23 @@ switch (spec.plot_type) {
         }];
         break;
 
+    case "density": {
+        // 2D counts from the server; empty cells stay transparent
+        const centers = e => e.slice(0, -1).map((v, i) => (v + e[i + 1]) / 2);
+        const z = spec.counts[0].map((_, j) => spec.counts.map(col => col[j] || null));
+        plotData = [{
+            x: centers(spec.x_edges),
+            y: centers(spec.y_edges),
+            z: z,
+            type: "heatmap",
+            colorscale: "Blues",
+            reversescale: true,
+            hoverongaps: false,
+            colorbar: { title: { text: "Rows" }, tickfont: { color: "#94a3b8" } }
+        }];
+        break;
+    }
+
     case "bar":
         plotData = [{
             x: spec.x,
@@ -937,6 +1095,30 @@ switch (spec.plot_type) {
         modeBarButtonsToRemove: ['lasso2d', 'select2d']
     };
 
+    if (spec.plot_type === "histogram" && spec.log_scale) {
+        layout.xaxis.type = "log";
+    }
+
+    // Tell the user when the spec was downsampled on the server
+    let note = null;
+    if (spec.plot_type === "density" && spec.total_points) {
+        note = `Density of ${spec.total_points.toLocaleString()} points`;
+    } else if (spec.total_points && spec.x && spec.total_points > spec.x.length) {
+        note = `Showing ${spec.x.length.toLocaleString()} of ${spec.total_points.toLocaleString()} points`;
+    }
+    if (note) {
+        layout.annotations = [{
+            text: note,
+            xref: "paper",
+            yref: "paper",
+            x: 1,
+            y: 1.06,
+            xanchor: "right",
+            showarrow: false,
+            font: { size: 12, color: "#94a3b8" }
+        }];
+    }
+
     Plotly.newPlot(container, plotData, layout, config);
 }
 function addLoadingIndicator() {
@@ -964,9 +1146,38 @@ function removeLoadingIndicator() {
     if (loading) loading.remove();
 }
 
-async function fetchObjectData(objId) {
+function arrowTableToRows(table) {
+    // Same row shape the JSON endpoint returns: plain values, ISO timestamps
+    const fields = table.schema.fields;
+    const columns = fields.map(f => table.getChild(f.name));
+    const isTime = fields.map(f => window.Arrow.DataType.isTimestamp(f.type) || window.Arrow.DataType.isDate(f.type));
+
+    const rows = [];
+    for (let i = 0; i < table.numRows; i++) {
+        const row = {};
+        fields.forEach((f, j) => {
+            let v = columns[j].get(i);
+            if (v === null || v === undefined) {
+                v = null;
+            } else if (isTime[j]) {
+                v = new Date(Number(v)).toISOString();
+            } else if (typeof v === "bigint") {
+                v = Number(v);
+            }
+            row[f.name] = v;
+        });
+        rows.push(row);
+    }
+    return rows;
+}
+
+async function fetchObjectData(objId, offset = 0, limit = TABLE_PAGE_SIZE) {
     try {
-        const resp = await authorizedFetch(`${API_BASE}/object/${objId}`);
+        // Tables come back as Arrow when the decoder is available; everything else is JSON
+        const accept = window.Arrow ? `${ARROW_STREAM_TYPE}, application/json` : "application/json";
+        const resp = await authorizedFetch(`${API_BASE}/object/${objId}?offset=${offset}&limit=${limit}`, {
+            headers: { "Accept": accept },
+        });
         if (!resp.ok) {
             console.error(`Failed to fetch object ${objId}`);
             return null;
@@ -980,7 +1191,15 @@ async function fetchObjectData(objId) {
             return { type: "image", data: blob };
         }
 
-        // Case 2: JSON (dataframe OR visualization OR raw object)
+        const total = parseInt(resp.headers.get("X-Total-Count"), 10);
+
+        // Case 2: Arrow stream (dataframe)
+        if (contentType && contentType.includes(ARROW_STREAM_TYPE)) {
+            const table = window.Arrow.tableFromIPC(await resp.arrayBuffer());
+            return { type: "data", data: arrowTableToRows(table), total: Number.isNaN(total) ? null : total };
+        }
+
+        // Case 3: JSON (dataframe OR visualization OR raw object)
         const json = await resp.json();
 
         // Visualization JSON
@@ -989,7 +1208,7 @@ async function fetchObjectData(objId) {
         }
 
         // Otherwise raw data table or raw python object
-        return { type: "data", data: json };
+        return { type: "data", data: json, total: Number.isNaN(total) ? null : total };
 
     } catch (error) {
         console.error(`Error fetching object ${objId}:`, error);
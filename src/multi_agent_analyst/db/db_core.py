@@ -2,16 +2,20 @@ import io
 import re
 import hashlib
 import logging
+import threading
+import time
 from contextlib import contextmanager
-from typing import Dict, List, Iterator, Optional
+from typing import Any, Callable, Dict, Iterable, List, Iterator, Optional
 
 import pandas as pd
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, event, text
 from sqlalchemy.engine import Connection
-from sqlalchemy.pool import NullPool
-from sqlalchemy.exc import ProgrammingError
+from sqlalchemy.exc import DBAPIError
 
 from src.backend.config import settings
+from src.backend.storage.query_cache import query_cache
+from src.multi_agent_analyst.utils.json_encoding import dumps
+from data.converter.infer_schema import conform_to_schema
 
 logger = logging.getLogger(__name__)
 
@@ -33,13 +37,92 @@ engine = create_engine(
     connect_args={'connect_timeout': 10}
 )
 
-# Base agent engine for SET ROLE operations
+# Base agent engine for SET ROLE operations. Connections are pooled:
+# the role and session settings are applied with SET LOCAL inside each
+# transaction, and the connection is reset again when it is returned.
 agent_base_engine = create_engine(
     APP_DATABASE_URL,
-    poolclass=NullPool,
+    pool_size=settings.agent_pool_size,
+    max_overflow=settings.agent_pool_max_overflow,
+    pool_timeout=10,
+    pool_recycle=3600,
+    pool_pre_ping=True,
+    # _reset_agent_connection does the rollback itself
+    pool_reset_on_return=None,
     connect_args={'connect_timeout': 10}
 )
 
+
+class PoolStats:
+    """
+    Checkout counters for the agent pool. A checkout that did not have to
+    open a new physical connection counts as a hit.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.connects = 0
+        self.checkout_seconds = 0.0
+        self.max_checkout_seconds = 0.0
+
+    def record_connect(self) -> None:
+        with self._lock:
+            self.connects += 1
+
+    def record_checkout(self, seconds: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.checkout_seconds += seconds
+            self.max_checkout_seconds = max(self.max_checkout_seconds, seconds)
+
+    def stats(self, pool) -> Dict[str, Any]:
+        with self._lock:
+            hits = max(self.checkouts - self.connects, 0)
+            return {
+                "checkouts": self.checkouts,
+                "new_connections": self.connects,
+                "hit_rate": hits / self.checkouts if self.checkouts else None,
+                "avg_checkout_ms": 1000 * self.checkout_seconds / self.checkouts if self.checkouts else None,
+                "max_checkout_ms": 1000 * self.max_checkout_seconds,
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "idle": pool.checkedin(),
+                "overflow": pool.overflow(),
+            }
+
+
+agent_pool_stats = PoolStats()
+
+
+@event.listens_for(agent_base_engine, "connect")
+def _count_agent_connect(dbapi_connection, connection_record):
+    agent_pool_stats.record_connect()
+
+
+@event.listens_for(agent_base_engine, "reset")
+def _reset_agent_connection(dbapi_connection, connection_record, reset_state):
+    """
+    Replaces the pool's own rollback-on-return. SET LOCAL already ends
+    with the transaction; also drop any role or setting that was changed
+    at session level before the connection is handed to another thread,
+    in one autocommit round-trip. An error here makes the pool discard
+    the connection instead of reusing it.
+    """
+    if reset_state.terminate_only:
+        return
+    # No round-trip unless a transaction is still open
+    dbapi_connection.rollback()
+    dbapi_connection.autocommit = True
+    try:
+        with dbapi_connection.cursor() as cur:
+            cur.execute("RESET ROLE; RESET ALL")
+    finally:
+        dbapi_connection.autocommit = False
+
+
+def get_agent_pool_stats() -> Dict[str, Any]:
+    return agent_pool_stats.stats(agent_base_engine.pool)
+
 SAFE_IDENTIFIER = re.compile(r"^[a-z_][a-z0-9_]*$")
 
 RESERVED_WORDS = {
@@ -127,19 +210,39 @@ def schema_exists(schema_name: str, conn: Connection) -> bool:
     )
     return result.fetchone() is not None
 
+# Thread roles known to exist. Roles are only dropped by cleanup_thread,
+# which evicts them; a role dropped elsewhere surfaces as a failed SET ROLE
+# in get_thread_conn, which evicts it and re-creates it once.
+_verified_roles = set()
+_verified_roles_lock = threading.Lock()
+
 def ensure_thread_role_exists(thread_id: str) -> None:
     """
     Ensure thread role exists. If not, initialize it.
     This provides auto-migration for existing threads.
+    Roles already verified by this process are not checked again.
     """
     safe_thread_id = validate_identifier(thread_id, "thread_id")
     role_name = get_thread_role_name(thread_id)
+
+    with _verified_roles_lock:
+        if role_name in _verified_roles:
+            return
     
-    if role_exists(role_name):
-        return
-    
-    logger.warning(f"Thread role {role_name} doesn't exist. Auto-initializing thread {thread_id}")
-    initialize_thread(thread_id)
+    if not role_exists(role_name):
+        logger.warning(f"Thread role {role_name} doesn't exist. Auto-initializing thread {thread_id}")
+        initialize_thread(thread_id)
+
+    with _verified_roles_lock:
+        _verified_roles.add(role_name)
+
+def forget_thread_role(thread_id: str) -> None:
+    """
+    Drop a thread role from the verified cache so the next
+    `ensure_thread_role_exists` checks the database again.
+    """
+    with _verified_roles_lock:
+        _verified_roles.discard(get_thread_role_name(thread_id))
 
 
 
@@ -204,6 +307,7 @@ def cleanup_thread(thread_id: str) -> None:
     role_name = get_thread_role_name(thread_id)
     
     logger.info(f"Cleaning up thread {thread_id}")
+    forget_thread_role(thread_id)
     
     with engine.begin() as conn:
         # Drop schema and all contents
@@ -217,17 +321,71 @@ def cleanup_thread(thread_id: str) -> None:
             # Drop the role
             conn.execute(text(f'DROP ROLE "{role_name}"'))
             
+    # Invalidate cached catalogs and query results of the thread
+    query_cache.bump_version(safe_thread_id)
     logger.info(f"Thread {thread_id} cleanup complete")
 
 
 
+AGENT_SESSION_SETTINGS = {
+    # Prevent runaway queries
+    "statement_timeout": "10s",
+    # Prevent memory exhaustion
+    "work_mem": "64MB",
+    # Prevent idle connections
+    "idle_in_transaction_session_timeout": "30s",
+}
+
+def thread_session_preamble(role_name: str, schema_name: str) -> str:
+    """
+    The SET LOCAL statements that put a transaction into a thread's role,
+    as a single batch. All of them end with the transaction.
+
+    The search path is ONLY the thread schema (no public fallback), which
+    prevents accidentally accessing shared tables.
+    """
+    statements = [
+        f'SET LOCAL ROLE "{role_name}"',
+        f'SET LOCAL search_path TO "{schema_name}"',
+    ] + [
+        f"SET LOCAL {name} = '{value}'"
+        for name, value in AGENT_SESSION_SETTINGS.items()
+    ]
+    return "; ".join(statements)
+
+# SET ROLE to a role that does not exist: invalid_parameter_value, or
+# undefined_object depending on the server version
+_MISSING_ROLE_CODES = {"22023", "42704"}
+
+def _begin_thread_session(conn: Connection, thread_id: str, role_name: str, schema_name: str):
+    """
+    Begin a transaction on `conn` in the thread's role. A role that was
+    verified earlier but has since been dropped is re-created once.
+    """
+    for attempt in range(2):
+        trans = conn.begin()
+        try:
+            conn.exec_driver_sql(thread_session_preamble(role_name, schema_name))
+            return trans
+        except DBAPIError as e:
+            trans.rollback()
+            forget_thread_role(thread_id)
+            if attempt == 0 and getattr(e.orig, "pgcode", None) in _MISSING_ROLE_CODES:
+                logger.warning(f"Thread role {role_name} is gone; re-verifying it")
+                ensure_thread_role_exists(thread_id)
+                continue
+            logger.error(f"Failed to SET ROLE {role_name}: {e}")
+            raise ValueError(f"Cannot assume role {role_name}. Thread may not be initialized.") from e
+
 @contextmanager
 def get_thread_conn(thread_id: str) -> Iterator[Connection]:
     """
     Get a connection that operates as the thread's role.
     
     SECURITY MODEL:
-    - Connection assumes the thread-specific role using SET ROLE
+    - Connection assumes the thread-specific role using SET LOCAL ROLE
+    - Connections are pooled; role and settings end with the transaction
+      and are RESET again when the connection is returned to the pool
     - Role has READ-ONLY access (SELECT only)
     - PostgreSQL enforces all permission checks
     - No JIT grants/revokes needed
@@ -248,29 +406,14 @@ def get_thread_conn(thread_id: str) -> Iterator[Connection]:
     
     logger.debug(f"Getting thread connection for {thread_id}, role: {role_name}")
     
+    checkout_started = time.perf_counter()
     with agent_base_engine.connect() as conn:
+        agent_pool_stats.record_checkout(time.perf_counter() - checkout_started)
         try:
-            with conn.begin():
-                # Assume the thread's role - THIS IS THE SECURITY BOUNDARY
-                try:
-                    conn.execute(text(f'SET ROLE "{role_name}"'))
-                    logger.debug(f"Successfully set role to {role_name}")
-                except ProgrammingError as e:
-                    logger.error(f"Failed to SET ROLE {role_name}: {e}")
-                    raise ValueError(f"Cannot assume role {role_name}. Thread may not be initialized.") from e
-                
-                # Set search path to ONLY the thread schema (no public fallback)
-                # This prevents accidentally accessing shared tables
-                conn.execute(text(f'SET search_path TO "{safe_thread_id}"'))
-                
-                # Prevent runaway queries
-                conn.execute(text("SET statement_timeout = '10s'"))
-                
-                # Prevent memory exhaustion
-                conn.execute(text("SET work_mem = '64MB'"))
-                
-                # Prevent idle connections
-                conn.execute(text("SET idle_in_transaction_session_timeout = '30s'"))
+            # Assume the thread's role - THIS IS THE SECURITY BOUNDARY.
+            # Role, search path and limits go out in one round-trip.
+            with _begin_thread_session(conn, thread_id, role_name, safe_thread_id):
+                logger.debug(f"Successfully set role to {role_name}")
                 
                 # Audit log the role assumption
                 logger.info(
@@ -283,9 +426,34 @@ def get_thread_conn(thread_id: str) -> Iterator[Connection]:
             logger.error(f"Error in thread connection for {thread_id}: {e}", exc_info=True)
             raise
         finally:
-            # Role automatically resets when connection closes
+            # Role ends with the transaction; the pool resets the connection on checkin
             logger.debug(f"Thread connection for {thread_id} closed")
 
+def iter_query_batches(conn: Connection, sql: str, batch_rows: int) -> Iterator[pd.DataFrame]:
+    """
+    Run a query through a server-side (named) cursor and yield the result
+    as DataFrames of at most `batch_rows` rows.
+
+    Rows are fetched `batch_rows` at a time, so neither psycopg2 nor pandas
+    ever holds the full result set. Must be consumed while `conn` is still
+    inside its transaction. Always yields at least one (possibly empty)
+    frame so callers see the column names.
+    """
+    result = conn.exec_driver_sql(
+        sql,
+        execution_options={"stream_results": True, "max_row_buffer": batch_rows},
+    )
+    try:
+        columns = list(result.keys())
+        empty = True
+        for rows in result.partitions(batch_rows):
+            empty = False
+            yield pd.DataFrame.from_records(rows, columns=columns, coerce_float=True)
+        if empty:
+            yield pd.DataFrame(columns=columns)
+    finally:
+        result.close()
+
 @contextmanager
 def agent_execution(thread_id: str) -> Iterator[None]:
     """
@@ -354,41 +522,94 @@ def create_table(schema_name: str, table_name: str, columns: Dict[str, str]) ->
         conn.execute(text(sql))
         logger.info(f"Table {safe_schema}.{safe_table} created")
 
-def copy_dataframe(schema_name: str, table_name: str, df: pd.DataFrame) -> None:
+def drop_table(schema_name: str, table_name: str) -> None:
     """
-    Bulk insert DataFrame into table using PostgreSQL COPY.
-    
+    Drop a table if it exists (e.g. one left empty by a failed upload).
+    """
+    safe_schema = validate_identifier(schema_name, "schema_name")
+    safe_table = validate_identifier(table_name, "table_name")
+
+    with engine.begin() as conn:
+        conn.execute(text(f'DROP TABLE IF EXISTS "{safe_schema}"."{safe_table}"'))
+        logger.info(f"Table {safe_schema}.{safe_table} dropped")
+
+def copy_dataframe_batches(
+    schema_name: str,
+    table_name: str,
+    batches: Iterable[pd.DataFrame],
+    column_types: Dict[str, str],
+    on_batch: Optional[Callable[[pd.DataFrame], None]] = None,
+) -> int:
+    """
+    Bulk insert a table that arrives as DataFrame batches, one COPY per
+    batch inside a single transaction, and return the number of rows.
+
+    Each batch is converted to `column_types` (the types the table was
+    created with); a column whose later values no longer fit is widened
+    (INTEGER -> BIGINT -> DOUBLE PRECISION -> TEXT) with ALTER TABLE
+    before that batch is copied. `on_batch` sees every batch after
+    conversion (e.g. for profiling).
+
     Security: Validates schema exists before writing.
     Uses privileged connection as COPY requires special permissions.
-    
-    Args:
-        schema_name: Target schema (typically thread_id)
-        table_name: Target table name
-        df: DataFrame to insert
     """
     safe_schema = validate_identifier(schema_name, "schema_name")
     safe_table = validate_identifier(table_name, "table_name")
-    
-    # Verify schema exists (security check)
+    column_types = dict(column_types)
+
     with engine.connect() as conn:
         if not schema_exists(safe_schema, conn):
             raise ValueError(f"Schema {safe_schema} does not exist")
-    
-    csv_buffer = io.StringIO()
-    df.to_csv(csv_buffer, index=False, header=False)
-    csv_buffer.seek(0)
 
+    rows = 0
     with get_conn() as conn:
-        with conn.cursor() as cur:
-            cur.copy_expert(
-                f'COPY "{safe_schema}"."{safe_table}" FROM STDIN WITH CSV',
-                csv_buffer
-            )
-        conn.commit()
-    
-    logger.info(f"Copied {len(df)} rows to {safe_schema}.{safe_table}")
+        try:
+            with conn.cursor() as cur:
+                for df in batches:
+                    for col in conform_to_schema(df, column_types):
+                        safe_col = validate_identifier(col, "column_name")
+                        pg_type = column_types[col]
+                        logger.info(f"Widening {safe_schema}.{safe_table}.{safe_col} to {pg_type}")
+                        cur.execute(
+                            f'ALTER TABLE "{safe_schema}"."{safe_table}" '
+                            f'ALTER COLUMN "{safe_col}" TYPE {pg_type}'
+                        )
+                    if on_batch is not None:
+                        on_batch(df)
+
+                    csv_buffer = io.StringIO()
+                    df.to_csv(csv_buffer, index=False, header=False)
+                    csv_buffer.seek(0)
+                    cur.copy_expert(
+                        f'COPY "{safe_schema}"."{safe_table}" FROM STDIN WITH CSV',
+                        csv_buffer
+                    )
+                    rows += len(df)
+
+                # Refresh planner statistics (and the reltuples row estimate
+                # the table catalog reports)
+                cur.execute(f'ANALYZE "{safe_schema}"."{safe_table}"')
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+    logger.info(f"Copied {rows} rows to {safe_schema}.{safe_table}")
+    return rows
+
+def ensure_data_source_profiles() -> None:
+    """
+    Add the column-profile column to data_sources if it is missing.
+    """
+    with engine.begin() as conn:
+        conn.execute(text("ALTER TABLE data_sources ADD COLUMN IF NOT EXISTS profile JSONB"))
 
-def register_data_source(thread_id: str, table_name: str, filename: str) -> int:
+def register_data_source(
+    thread_id: str,
+    table_name: str,
+    filename: str,
+    profile: Optional[Dict[str, Any]] = None,
+) -> int:
     """
     Register a data source in the global tracking table.
     
@@ -396,6 +617,7 @@ def register_data_source(thread_id: str, table_name: str, filename: str) -> int:
         thread_id: Thread identifier
         table_name: Name of table
         filename: Original filename
+        profile: Per-column profile statistics (see utils.profiling)
         
     Returns:
         ID of created data source record
@@ -404,15 +626,16 @@ def register_data_source(thread_id: str, table_name: str, filename: str) -> int:
     safe_table = validate_identifier(table_name, "table_name")
 
     sql = """
-        INSERT INTO data_sources (thread_id, table_name, original_filename)
-        VALUES (:thread_id, :table_name, :filename)
+        INSERT INTO data_sources (thread_id, table_name, original_filename, profile)
+        VALUES (:thread_id, :table_name, :filename, CAST(:profile AS JSONB))
         RETURNING id
     """
     with engine.begin() as conn:
         res = conn.execute(text(sql), {
             "thread_id": safe_thread_id,
             "table_name": safe_table,
-            "filename": filename
+            "filename": filename,
+            "profile": dumps(profile).decode() if profile is not None else None,
         })
         source_id = int(res.fetchone()[0])
     
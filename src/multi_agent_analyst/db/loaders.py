@@ -1,68 +1,93 @@
-import pandas as pd
 from sqlalchemy import text
 from src.multi_agent_analyst.db.db_core import engine, validate_identifier
+from src.backend.storage.catalog_cache import catalog_cache
 
+# Tables, columns, row estimates and upload-time column profiles of one
+# schema in a single query.
+CATALOG_SQL = text("""
+    SELECT c.relname AS table_name,
+           c.reltuples AS row_estimate,
+           a.attname AS column_name,
+           format_type(a.atttypid, a.atttypmod) AS data_type,
+           ds.profile -> a.attname AS profile
+    FROM pg_catalog.pg_class c
+    JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+    LEFT JOIN pg_catalog.pg_attribute a
+           ON a.attrelid = c.oid AND a.attnum > 0 AND NOT a.attisdropped
+    -- A table re-uploaded under the same name has several data_sources
+    -- rows; only the latest one describes the current table.
+    LEFT JOIN LATERAL (
+        SELECT d.profile
+        FROM data_sources d
+        WHERE d.thread_id = n.nspname AND d.table_name = c.relname
+        ORDER BY d.id DESC
+        LIMIT 1
+    ) ds ON TRUE
+    WHERE n.nspname = :schema
+      AND c.relkind IN ('r', 'p')
+    ORDER BY c.relname, a.attnum
+""")
 
-def load_user_tables(thread_id: str) -> dict:
+
+def read_catalog(schema: str) -> dict:
     """
-    Backend-only loader. Uses thread_id to query the correct schema,
-    but returns ONLY table information (no schema/thread_id in output).
+    Build the table catalog of a schema from pg_catalog, with the column
+    profiles recorded in data_sources at upload time. Row counts are
+    the planner's `reltuples` estimates (kept current by the ANALYZE after
+    each upload); tables that were never analyzed are counted exactly.
     """
-    schema = validate_identifier(thread_id, "thread_id")
-
     result = {
         "available_tables": [],
         "tables": {}
     }
 
-    tables_df = pd.read_sql(
-        text("""
-            SELECT table_name
-            FROM information_schema.tables
-            WHERE table_schema = :schema
-              AND table_type = 'BASE TABLE'
-            ORDER BY table_name
-        """),
-        engine,
-        params={"schema": schema},
-    )
-
-    table_names = tables_df["table_name"].tolist()
-    result["available_tables"] = table_names
-
-    for table_name in table_names:
-
-        cols_df = pd.read_sql(
-            text("""
-                SELECT column_name, data_type
-                FROM information_schema.columns
-                WHERE table_schema = :schema
-                  AND table_name = :table
-                ORDER BY ordinal_position
-            """),
-            engine,
-            params={"schema": schema, "table": table_name},
-        )
+    with engine.begin() as conn:
+        rows = conn.execute(CATALOG_SQL, {"schema": schema}).fetchall()
 
-        columns = [
-            {"name": str(r["column_name"]), "type": str(r["data_type"])}
-            for _, r in cols_df.iterrows()
-        ]
+        for table_name, row_estimate, column_name, data_type, profile in rows:
+            table = result["tables"].get(table_name)
+            if table is None:
+                result["available_tables"].append(table_name)
+                table = result["tables"][table_name] = {
+                    "row_count": int(row_estimate),
+                    "columns": [],
+                }
+            if column_name is not None:
+                column = {"name": str(column_name), "type": str(data_type)}
+                if profile is not None:
+                    column["profile"] = profile
+                table["columns"].append(column)
 
-        with engine.begin() as conn:
+        unanalyzed = [t for t, info in result["tables"].items() if info["row_count"] < 0]
+        if unanalyzed:
             conn.execute(text("SET LOCAL row_security = on"))
             conn.execute(
                 text("SET LOCAL app.current_thread_id = :tid"),
                 {"tid": schema},
             )
+            for table_name in unanalyzed:
+                result["tables"][table_name]["row_count"] = int(conn.execute(
+                    text(f'SELECT COUNT(*) FROM "{schema}"."{table_name}"')
+                ).scalar())
 
-            row_count = conn.execute(
-                text(f'SELECT COUNT(*) FROM "{schema}"."{table_name}"')
-            ).scalar()
+    return result
+
+
+def load_user_tables(thread_id: str) -> dict:
+    """
+    Backend-only loader. Uses thread_id to query the correct schema,
+    but returns ONLY table information (no schema/thread_id in output).
+
+    Served from the per-thread catalog cache; the catalog is rebuilt only
+    after the thread's data version changes (upload, cleanup).
+    """
+    schema = validate_identifier(thread_id, "thread_id")
 
-        result["tables"][table_name] = {
-            "row_count": int(row_count),
-            "columns": columns,
-        }
+    version = catalog_cache.data_version(schema)
+    cached = catalog_cache.get(schema, version)
+    if cached is not None:
+        return cached
 
-    return result
\ No newline at end of file
+    result = read_catalog(schema)
+    catalog_cache.put(schema, version, result)
+    return result
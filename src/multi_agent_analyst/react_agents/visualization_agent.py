@@ -16,7 +16,7 @@ from src.multi_agent_analyst.tools.visualization_agent_tools import (
     make_bar_chart_tool, 
     make_histogram_tool
 )
-from src.multi_agent_analyst.utils.utils import context, agent_error, agent_success, object_store, execution_list, ExecutionLogEntry, generate_data_preview, load_and_validate_df
+from src.multi_agent_analyst.utils.utils import context, agent_error, agent_success, object_store, execution_list, ExecutionLogEntry, generate_data_preview, load_and_validate_df, validate_object
 from src.backend.llm.registry import  get_mini_llm, get_default_llm
 from src.multi_agent_analyst.logging import logger
 from src.backend.storage.emitter import emit
@@ -33,14 +33,14 @@ def visualization_agent(visualizer_query: str, current_plan_step: str, data_id:
             "step_id": current_plan_step,
         }
     )
-    try:
-        df = object_store.get(data_id)
-        if len(df) < 2:
-            raise ValueError("Visualization Agent requires at least two columns")
-    except Exception as e:
+    meta, error = validate_object(data_id)
+    if error:
+        return agent_error(error)
+
+    if meta.get("shape", [0])[0] < 2:
         return {"status":"error",
                 "object_id":None,
-                "exception":str(e)
+                "exception":"Visualization Agent requires at least two rows"
                 }
 
     data_overview=generate_data_preview(data_id)
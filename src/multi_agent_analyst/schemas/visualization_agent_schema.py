@@ -35,3 +35,5 @@ class ExternalAgentSchema(BaseModel):
 class HistogramSchema(BaseModel):
     model_config=ConfigDict(extra='forbid')
     column:str=Field(..., description='Column for the histogram')
+    bins: Optional[int] = Field(None, description='Number of bins; omit to pick them automatically (Freedman–Diaconis)')
+    log_scale: bool = Field(False, description='Use log-spaced bins, for strictly positive, heavily skewed data')
@@ -14,29 +14,16 @@ from src.multi_agent_analyst.schemas.analysis_agent_schema import (
     DistributionSchema
 )
 from src.multi_agent_analyst.utils.utils import object_store
+from src.multi_agent_analyst.utils.json_encoding import clean_frame, to_jsonable
+from src.multi_agent_analyst.utils.binning import histogram_bins
 from scipy import stats
-import math
-
-def sanitize_for_json(obj):
-    if isinstance(obj, dict):
-        return {k: sanitize_for_json(v) for k, v in obj.items()}
-    elif isinstance(obj, list):
-        return [sanitize_for_json(v) for v in obj]
-    elif isinstance(obj, float):
-        if math.isnan(obj) or math.isinf(obj):
-            return None  # → serialized as `null`
-        return obj
-    elif obj is None:
-        return None
-    else:
-        return obj
 
 def make_correlation_tool(df):
     def correlation():
         try:
             result = df.corr(numeric_only=True)
             table_shape=result.shape
-            result=sanitize_for_json(result)
+            result = clean_frame(result)
             
         except Exception as e:
             return {
@@ -85,9 +72,9 @@ def make_anomaly_tool(df):
             annotated_df = df.copy()
             annotated_df["outlier"] = mask.any(axis=1)
             table_shape=annotated_df.shape
-            annotated_df=sanitize_for_json(annotated_df)
+            annotated_df = clean_frame(annotated_df)
 
-            obj_id = object_store.save(annotated_df)
+            obj_id, outliers_id = object_store.save_many([annotated_df, outlier_rows])
 
             details = {
                 "outlier_count": outlier_count,
@@ -100,6 +87,7 @@ def make_anomaly_tool(df):
 
             result = {
                 'object_id':obj_id,
+                'outliers_object_id':outliers_id,
                 'details':details,
                 "operation_type":"Anomaly detection"
                 }
@@ -125,7 +113,7 @@ def make_summary_tool(df):
         try:
             stats = df.describe(include="all").to_dict()
             table_shape=stats.shape
-            stats = sanitize_for_json(stats)
+            stats = to_jsonable(stats)
             
         except Exception as e:
             return {
@@ -173,7 +161,7 @@ def make_groupby_tool(df):
                 .reset_index()
             )
             table_shape=grouped.shape
-            grouped=sanitize_for_json(grouped)
+            grouped = clean_frame(grouped)
 
             
 
@@ -295,7 +283,7 @@ def make_filter_tool(df):
 
             filtered = df[mask]
             table_shape=filtered.shape
-            filtered=sanitize_for_json(filtered)
+            filtered = clean_frame(filtered)
 
             obj_id = object_store.save(filtered)
 
@@ -339,7 +327,7 @@ def make_sort_tool(df):
                   .head(limit)
             )
             table_shape=sorted_df.shape
-            sorted_df=sanitize_for_json(sorted_df)
+            sorted_df = clean_frame(sorted_df)
 
             obj_id = object_store.save(sorted_df)
 
@@ -404,14 +392,14 @@ def make_distribution_tool(df):
             else:
                 shape = "moderately skewed"
 
-            counts, bin_edges = np.histogram(series, bins='auto')
+            bin_edges, counts = histogram_bins(series)
             dist_df = pd.DataFrame({
                 "bin_start": bin_edges[:-1],
                 "bin_end": bin_edges[1:],
                 "count": counts
             })
             
-            dist_df = sanitize_for_json(dist_df)
+            dist_df = clean_frame(dist_df)
             obj_id = object_store.save(dist_df)
 
             return {
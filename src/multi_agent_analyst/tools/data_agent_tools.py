@@ -9,29 +9,23 @@ from src.multi_agent_analyst.schemas.data_agent_schema import (
 
 from src.multi_agent_analyst.db.db_core import get_thread_conn
 from src.backend.storage.emitter import current_thread_id
+from src.backend.storage.query_cache import query_cache
 
 from src.multi_agent_analyst.utils.utils import object_store, current_tables
 import pandas as pd
 from langchain_core.tools import StructuredTool
 
-from src.multi_agent_analyst.db.db_core import engine, get_thread_conn, agent_execution
-from src.multi_agent_analyst.utils.utils import object_store, current_tables, normalize_dataframe_types
+from src.multi_agent_analyst.db.db_core import engine, get_thread_conn, agent_execution, iter_query_batches
+from src.backend.config import settings
+from src.multi_agent_analyst.utils.utils import (
+    object_store,
+    current_tables,
+    normalize_dataframe_types,
+    conform_dataframe_types,
+)
+from src.multi_agent_analyst.utils.json_encoding import to_jsonable
+from src.multi_agent_analyst.utils.profiling import describe_profile
 import re
-import math 
-
-def sanitize_for_json(obj):
-    if isinstance(obj, dict):
-        return {k: sanitize_for_json(v) for k, v in obj.items()}
-    if isinstance(obj, list):
-        return [sanitize_for_json(v) for v in obj]
-    if isinstance(obj, (pd.Timestamp,)):
-        return obj.isoformat()
-    if isinstance(obj, float):
-        if math.isnan(obj) or math.isinf(obj):
-            return None
-        return obj
-    return obj
-
 
 def qualify_sql(sql: str, schema: str) -> str:
     """
@@ -45,24 +39,93 @@ def qualify_sql(sql: str, schema: str) -> str:
         flags=re.IGNORECASE
     )
 
+SQL_RESULT_TTL = 3600
+
+def _capped_batches(batches, max_rows: int, status: dict):
+    """
+    Pass through normalized row batches until `max_rows` rows have been
+    yielded; sets status["truncated"] if the result had more rows.
+
+    Column types are inferred once, from the first batch; later batches
+    are cast to them (widening to string on conflict) instead of being
+    inferred again, so every batch has the same dtypes.
+    """
+    remaining = max_rows
+    dtypes = None
+    for df in batches:
+        if remaining <= 0:
+            if len(df):
+                status["truncated"] = True
+                break
+            continue
+        if len(df) > remaining:
+            df = df.iloc[:remaining]
+            status["truncated"] = True
+        remaining -= len(df)
+        if dtypes is None:
+            # All-null columns carry no type information yet; leave them
+            # untyped until a batch with values arrives.
+            untyped = [c for c in df.columns if df[c].isna().all()]
+            normalized = normalize_dataframe_types(df)
+            normalized[untyped] = df[untyped]
+            df = normalized
+            dtypes = {c: (None if c in untyped else t) for c, t in df.dtypes.items()}
+        else:
+            df = conform_dataframe_types(df, dtypes)
+        yield df
+        if status["truncated"]:
+            break
+
+def _result_details(meta: dict, truncated_at=None) -> dict:
+    details = {
+        "row_count": meta["shape"][0],
+        "columns": meta["columns"],
+    }
+    if truncated_at is not None:
+        details["truncated"] = True
+        details["note"] = (
+            f"Result truncated to the first {truncated_at} rows; "
+            "add filters or aggregation to narrow it down."
+        )
+    return details
+
 def make_sql_query_tool():
     thread_id = current_thread_id.get()
     def sql_query(query: str):
+        # Same query on unchanged data: reuse the stored result
+        version = query_cache.data_version(thread_id)
+        cached = query_cache.get(thread_id, version, query)
+        if cached:
+            try:
+                meta = object_store.get_meta(cached["object_id"])
+                return {
+                    "object_id": cached["object_id"],
+                    "details": _result_details(meta, cached["truncated_at"]),
+                    "exception": None
+                }
+            except KeyError:
+                pass
+
         try:
             with agent_execution(thread_id):
                 with get_thread_conn(thread_id) as conn:
                     qualified_query = qualify_sql(query, thread_id)
 
-                    df = pd.read_sql_query(qualified_query, conn)
-                    df = normalize_dataframe_types(df)
-                    obj_id = object_store.save(df)
+                    # Server-side cursor: rows go to the object store batch
+                    # by batch instead of being buffered in full.
+                    status = {"truncated": False}
+                    batches = _capped_batches(
+                        iter_query_batches(conn, qualified_query, settings.object_chunk_rows),
+                        settings.sql_max_result_rows,
+                        status,
+                    )
+                    obj_id, meta = object_store.save_frames(batches, ttl=SQL_RESULT_TTL)
+                    truncated_at = settings.sql_max_result_rows if status["truncated"] else None
+                    query_cache.put(thread_id, version, query, obj_id, SQL_RESULT_TTL, truncated_at)
 
                     return {
                         "object_id": obj_id,
-                        "details": {
-                            "row_count": len(df),
-                            "columns": list(df.columns),
-                        },
+                        "details": _result_details(meta, truncated_at),
                         "exception": None
                     }
 
@@ -103,6 +166,7 @@ def make_schema_list(schemas: dict):
             columns = meta.get("columns", [])
             column_strings = [
                 f"{col['name']} ({col['type']})"
+                + (f": {describe_profile(col['profile'])}" if col.get("profile") else "")
                 for col in columns
             ]
 
@@ -138,21 +202,19 @@ def make_select_columns_tool():
 
     def select_columns(table_id: str, columns: list):
         try:
-            df = object_store.get(table_id)
-            result = df[columns]
+            obj_id = object_store.save_view(table_id, columns=columns)
+            meta = object_store.get_meta(obj_id)
         except Exception as e:
             return {
                 'exception': str(e)
             }
-        
-        obj_id = object_store.save(result)
 
         return {
                 "object_id": obj_id,
                 "details": {
                     "input_table_id": table_id,
                     "selected_columns": columns,
-                    "output_rows": len(result),
+                    "output_rows": meta["shape"][0],
                     "output_cols": len(columns),
                     },
 
@@ -169,8 +231,7 @@ def make_merge_tool():
 
     def merge_tables(left_id: str, right_id: str, on: str, how: str = "inner"):
         try:
-            left = object_store.get(left_id)
-            right = object_store.get(right_id)
+            left, right = object_store.get_many([left_id, right_id])
 
             merged = left.merge(right, on=on, how=how)
 
@@ -190,7 +251,7 @@ def make_merge_tool():
             "exception": None,
         }
 
-        return sanitize_for_json(payload)
+        return to_jsonable(payload)
 
     return StructuredTool.from_function(
         func=merge_tables,
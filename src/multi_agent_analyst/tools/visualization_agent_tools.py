@@ -13,9 +13,19 @@ from src.multi_agent_analyst.schemas.visualization_agent_schema import (
     HistogramSchema, 
     
 )
-from typing import List
+from typing import List, Optional
 import pandas as pd 
 from src.multi_agent_analyst.utils.utils import object_store
+from src.multi_agent_analyst.utils.downsampling import downsample_line, downsample_scatter
+from src.multi_agent_analyst.utils.binning import histogram_bins, density_grid
+from src.multi_agent_analyst.utils.typed_arrays import encode_array
+from src.backend.config import settings
+
+def viz_array(values):
+    """Series for a viz spec: typed-array encoded, or a plain list when VIZ_TYPED_ARRAYS is off."""
+    if settings.viz_typed_arrays:
+        return encode_array(values)
+    return values.tolist() if hasattr(values, "tolist") else list(values)
 
 def make_scatter_plot_tool(df):
     def scatter_plot(x_axis: str , y_axis: str):
@@ -27,11 +37,28 @@ def make_scatter_plot_tool(df):
             if not x_col or not y_col:
                 raise ValueError("Insufficient numeric data for scatter plot.")
 
+            numeric_axes = x_col in numeric_cols and y_col in numeric_cols
+            if numeric_axes and len(df) > settings.viz_density_threshold_rows:
+                # Too many points for markers to mean anything: show where they cluster
+                x_edges, y_edges, counts = density_grid(df[x_col], df[y_col], settings.viz_density_grid_size)
+                vis_json = {
+                    "type": "visualization",
+                    "plot_type": "density",
+                    "x_edges": x_edges.tolist(),
+                    "y_edges": y_edges.tolist(),
+                    "counts": counts.tolist(),
+                    "total_points": len(df),
+                    "labels": {"x": x_col, "y": y_col},
+                }
+                obj_id = object_store.save(vis_json)
+                return {"object_id": obj_id, "status": "success", "plot_type":'Density Plot'}
+
+            points = downsample_scatter(df[x_col], df[y_col], settings.viz_max_points)
             vis_json = {
                 "type": "visualization",
                 "plot_type": "scatter",
-                "x": df[x_col].tolist(),
-                "y": df[y_col].tolist(),
+                **{key: viz_array(values) for key, values in points.items()},
+                "total_points": len(df),
                 "labels": {"x": x_col, "y": y_col},
             }
             obj_id = object_store.save(vis_json)
@@ -54,7 +81,7 @@ def make_scatter_plot_tool(df):
     )
 
 def make_histogram_tool(df):
-    def histogram(column: str):
+    def histogram(column: str, bins: Optional[int] = None, log_scale: bool = False):
         try:
             numeric_cols = df.select_dtypes(include=['number']).columns.tolist()
             selected_col = column if column in numeric_cols else (numeric_cols[0] if numeric_cols else None)
@@ -62,13 +89,16 @@ def make_histogram_tool(df):
             if not selected_col:
                 raise ValueError("No numeric data available.")
 
-            # Ensure data is numeric and drop NaNs
-            plot_data = df[selected_col].dropna().tolist()
+            # Bin on the server so the spec is O(bins), not O(rows)
+            edges, counts = histogram_bins(df[selected_col], bins=bins, log_scale=log_scale)
 
             vis_json = {
                 "type": "visualization",
                 "plot_type": "histogram",
-                "x": plot_data,  
+                "bin_edges": viz_array(edges),
+                "counts": viz_array(counts),
+                "log_scale": log_scale,
+                "total_points": int(counts.sum()),
                 "labels": {"x": selected_col, "y": "Frequency"},
             }
             
@@ -98,11 +128,19 @@ def make_line_plot_tool(df):
 
             temp_df = df.sort_values(by=x_axis) if x_axis in df.columns else df
 
+            x_values = temp_df[x_axis] if x_axis in temp_df.columns else pd.Series(range(len(temp_df)))
+            x, y = downsample_line(
+                x_values.reset_index(drop=True),
+                temp_df[y_col].astype(float).reset_index(drop=True),
+                settings.viz_max_points,
+            )
+
             vis_json = {
                 "type": "visualization",
                 "plot_type": "line_plot",
-                "x": temp_df[x_axis].tolist() if x_axis in temp_df.columns else list(range(len(temp_df))),
-                "y": temp_df[y_col].astype(float).tolist(),
+                "x": viz_array(x),
+                "y": viz_array(y),
+                "total_points": len(temp_df),
                 "labels": {"x": x_axis or "Index", "y": y_col},
             }
         
@@ -142,8 +180,8 @@ def make_pie_chart_tool(df):
             vis_json = {
                 "type": "visualization",
                 "plot_type": "pie_chart",
-                "labels": df[category_column].tolist(),
-                "values": df[value_column].tolist(),
+                "labels": viz_array(df[category_column]),
+                "values": viz_array(df[value_column]),
                 "title": f"{value_column} by {category_column}"
             }
             
@@ -183,8 +221,8 @@ def make_bar_chart_tool(df):
             vis_json = {
                 "type": "visualization",
                 "plot_type": "bar",
-                "x": df[category_column].tolist(), 
-                "y": df[value_column].tolist(),  
+                "x": viz_array(df[category_column]), 
+                "y": viz_array(df[value_column]),  
                 "title": f"{value_column} by {category_column}",
                 "labels": {
                     "x": category_column,
@@ -0,0 +1,69 @@
+"""
+Server-side binning shared by histogram / density specs and distribution
+analysis, so only bin edges and counts leave the backend, never the raw
+columns.
+"""
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Freedman–Diaconis can ask for thousands of bins on heavy-tailed data.
+MAX_BINS = 200
+
+
+def histogram_bins(
+    values: pd.Series,
+    bins: Optional[int] = None,
+    log_scale: bool = False,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Bin a numeric column and return (edges, counts).
+
+    `bins` fixes the number of bins; otherwise the Freedman–Diaconis rule
+    is used (Sturges when the IQR is zero), capped at MAX_BINS. With
+    `log_scale` the bins are equal-width in log10 space, which requires
+    strictly positive values.
+    """
+    data = values.to_numpy(dtype="float64", na_value=np.nan)
+    data = data[np.isfinite(data)]
+    if len(data) == 0:
+        raise ValueError("No finite values to bin")
+
+    if log_scale:
+        if (data <= 0).any():
+            raise ValueError("Log-scale histograms require strictly positive values")
+        data = np.log10(data)
+
+    if bins is None:
+        q1, q3 = np.percentile(data, [25, 75])
+        edges = np.histogram_bin_edges(data, bins="fd" if q3 > q1 else "sturges")
+        if len(edges) - 1 > MAX_BINS:
+            edges = np.histogram_bin_edges(data, bins=MAX_BINS)
+    else:
+        edges = np.histogram_bin_edges(data, bins=min(max(bins, 1), MAX_BINS))
+
+    counts, edges = np.histogram(data, bins=edges)
+    if log_scale:
+        edges = np.power(10.0, edges)
+    return edges, counts
+
+
+def density_grid(
+    x: pd.Series,
+    y: pd.Series,
+    bins: int,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Count points on a `bins` x `bins` grid and return
+    (x_edges, y_edges, counts), with counts[i, j] the number of points in
+    x bin i and y bin j. Rows where either value is missing are dropped.
+    """
+    xs = x.to_numpy(dtype="float64", na_value=np.nan)
+    ys = y.to_numpy(dtype="float64", na_value=np.nan)
+    finite = np.isfinite(xs) & np.isfinite(ys)
+    if not finite.any():
+        raise ValueError("No finite points to bin")
+
+    counts, x_edges, y_edges = np.histogram2d(xs[finite], ys[finite], bins=bins)
+    return x_edges, y_edges, counts.astype(np.int64)
@@ -0,0 +1,111 @@
+"""
+Point reduction for visualization specs.
+
+Line plots use Largest-Triangle-Three-Buckets, which keeps the points that
+shape the curve (peaks, dips, steps). Scatter plots are binned on a 2D
+grid; each occupied cell becomes one point at the centroid of its members
+with a count, so dense regions and isolated outliers both survive.
+"""
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+
+def _as_numeric(values: pd.Series) -> np.ndarray:
+    """
+    Float positions for an axis: numbers as-is, datetimes as nanoseconds,
+    anything else (categories, strings) by row position.
+    """
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values.to_numpy(dtype="datetime64[ns]").astype("int64").astype("float64")
+    if pd.api.types.is_numeric_dtype(values):
+        return values.to_numpy(dtype="float64", na_value=np.nan)
+    return np.arange(len(values), dtype="float64")
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, max_points: int) -> np.ndarray:
+    """
+    Indices of the points LTTB keeps out of (x, y), sorted by x. Returns
+    every index when the series already fits in `max_points`.
+    """
+    n = len(x)
+    if n <= max_points or max_points < 3:
+        return np.arange(n)
+
+    # Buckets split the points between the fixed first and last ones.
+    edges = np.linspace(1, n - 1, max_points - 1).astype(np.int64)
+    kept = np.empty(max_points, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+
+    a = 0
+    for i in range(max_points - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+
+        area = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(area))
+        kept[i + 1] = a
+
+    return kept
+
+
+def bin_points(x: np.ndarray, y: np.ndarray, max_points: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Reduce a point cloud to at most `max_points` grid-cell centroids.
+    Returns (x, y, counts).
+    """
+    grid = max(int(np.sqrt(max_points)), 1)
+
+    def cell_of(values):
+        lo, hi = values.min(), values.max()
+        if hi == lo:
+            return np.zeros(len(values), dtype=np.int64)
+        return np.minimum(((values - lo) / (hi - lo) * grid).astype(np.int64), grid - 1)
+
+    cells = cell_of(x) * grid + cell_of(y)
+    _, inverse, counts = np.unique(cells, return_inverse=True, return_counts=True)
+    return (
+        np.bincount(inverse, weights=x) / counts,
+        np.bincount(inverse, weights=y) / counts,
+        counts,
+    )
+
+
+def downsample_line(x: pd.Series, y: pd.Series, max_points: int) -> Tuple[pd.Series, pd.Series]:
+    """
+    LTTB-reduce a line series. `x` must already be sorted; the original
+    x labels (dates, strings) and dtypes of the kept points are returned
+    unchanged.
+    """
+    if len(x) <= max_points:
+        return x, y
+
+    valid = y.notna().to_numpy()
+    x, y = x[valid], y[valid]
+    kept = lttb_indices(_as_numeric(x), y.to_numpy(dtype="float64"), max_points)
+    return x.iloc[kept], y.iloc[kept]
+
+
+def downsample_scatter(x: pd.Series, y: pd.Series, max_points: int) -> dict:
+    """
+    Reduce a scatter series to at most `max_points` points. Numeric axes
+    are binned (adding per-point `counts`); otherwise rows are sampled.
+    Values are Series / arrays, ready for `viz_array`.
+    """
+    if len(x) <= max_points:
+        return {"x": x, "y": y}
+
+    if pd.api.types.is_numeric_dtype(x) and pd.api.types.is_numeric_dtype(y):
+        xs, ys = _as_numeric(x), _as_numeric(y)
+        finite = np.isfinite(xs) & np.isfinite(ys)
+        bx, by, counts = bin_points(xs[finite], ys[finite], max_points)
+        return {"x": bx, "y": by, "counts": counts}
+
+    rows = np.sort(np.random.default_rng(0).choice(len(x), max_points, replace=False))
+    return {"x": x.iloc[rows], "y": y.iloc[rows]}
@@ -0,0 +1,117 @@
+"""
+JSON encoding for API responses, tool outputs and execution state.
+
+orjson serializes numpy scalars / arrays and datetimes natively and writes
+NaN and ±inf as null, so values never have to be walked in Python. The
+few pandas-only values it does not know (Timestamp, NaT, NA) go through
+`_default`; anything else unknown is written as its str(), like the old
+`json_safe`.
+"""
+from typing import Any, Iterable, List
+
+import numpy as np
+import orjson
+import pandas as pd
+
+_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, pd.Timestamp):
+        return obj.isoformat()
+    if obj is pd.NaT or obj is pd.NA:
+        return None
+    if isinstance(obj, pd.DataFrame):
+        return frame_records(obj)
+    if isinstance(obj, pd.Series):
+        return obj.to_numpy(dtype=object, na_value=None)
+    if isinstance(obj, np.ndarray):
+        # Non-contiguous or object arrays that orjson rejects natively.
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    return str(obj)
+
+
+def clean_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Replace ±inf with NaN in the float columns of a DataFrame. Works on
+    whole columns at once and returns `df` itself when nothing changes.
+    """
+    float_cols = df.columns[[pd.api.types.is_float_dtype(t) for t in df.dtypes]]
+    if len(float_cols) == 0:
+        return df
+
+    values = df[float_cols].to_numpy(dtype="float64", na_value=np.nan)
+    infinite = np.isinf(values)
+    if not infinite.any():
+        return df
+
+    df = df.copy()
+    df[float_cols] = np.where(infinite, np.nan, values)
+    return df
+
+
+def _column_values(series: pd.Series) -> list:
+    dtype = series.dtype
+
+    if isinstance(dtype, np.dtype) and dtype.kind == "M":
+        # Let orjson format the whole column instead of boxing every
+        # value into a Timestamp; NaT is not representable, so mask it.
+        values = series.to_numpy()
+        nat = np.isnat(values)
+        if nat.any():
+            values = np.where(nat, np.datetime64(0, "ns"), values)
+        strings = orjson.loads(orjson.dumps(values, option=_OPTIONS))
+        for i in np.flatnonzero(nat):
+            strings[i] = None
+        return strings
+
+    if isinstance(dtype, np.dtype) and dtype.kind in "biuf":
+        return series.to_numpy().tolist()
+
+    return series.to_numpy(dtype=object, na_value=None).tolist()
+
+
+def frame_records(df: pd.DataFrame) -> List[dict]:
+    """
+    DataFrame rows as a list of dicts, ready for `dumps`. Values are
+    converted a column at a time, which is several times faster than
+    `to_dict(orient="records")` on wide or datetime-heavy frames.
+    """
+    df = clean_frame(df)
+    names = list(df.columns)
+    columns = [_column_values(df.iloc[:, i]) for i in range(len(names))]
+    return [dict(zip(names, row)) for row in zip(*columns)]
+
+
+def dumps(obj: Any) -> bytes:
+    """
+    Serialize an object (DataFrames as a list of records) to JSON bytes.
+    """
+    if isinstance(obj, pd.DataFrame):
+        obj = frame_records(obj)
+    return orjson.dumps(obj, default=_default, option=_OPTIONS)
+
+
+def dumps_lines(records: Iterable[Any]) -> bytes:
+    """
+    Serialize records as newline-delimited JSON.
+    """
+    return b"".join(
+        orjson.dumps(record, default=_default, option=_OPTIONS) + b"\n"
+        for record in records
+    )
+
+
+def to_jsonable(obj: Any) -> Any:
+    """
+    Plain Python structure (dict / list / str / float / int / bool / None)
+    equivalent to `obj`, for callers that need values rather than bytes
+    (tool outputs, metadata samples).
+    """
+    return orjson.loads(dumps(obj))
+
+
+def loads(data) -> Any:
+    return orjson.loads(data)
@@ -0,0 +1,431 @@
+"""
+Typed codecs for the Redis object store.
+
+Every blob written by RedisObjectStore starts with a small header so the
+reader knows how to decode the body:
+
+    MAGIC (4 bytes) | FORMAT (1 byte) | CODEC (1 byte) | RAW_LEN (8 bytes) | body
+
+- FORMAT_ARROW:   pandas DataFrame as an Arrow IPC stream
+- FORMAT_MSGPACK: plain dicts / lists (viz specs, analysis results)
+- FORMAT_PICKLE:  everything else (images, numpy objects, exotic frames)
+- FORMAT_CHUNKED: manifest of a large DataFrame stored as separate
+                  per-column, per-row-group Arrow blobs
+- FORMAT_REF:     alias pointing at a shared content-addressed blob
+- FORMAT_SPILL:   pointer to a DataFrame spilled to a local Arrow file
+- FORMAT_VIEW:    lazy column / row projection of another DataFrame
+
+Bodies larger than the caller's threshold are compressed with the codec
+picked for their format (zstd for tables and pickles, lz4 for msgpack,
+which is read far more often than it is written). RAW_LEN is the body
+size before compression.
+
+Blobs with the older `MAA\x01` header carry only the format tag and are
+never compressed. Blobs that do not start with either magic were written
+before the codec layer existed and are plain pickles.
+"""
+import hashlib
+import io
+import pickle
+import struct
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+import lz4.frame
+import orjson
+import ormsgpack
+import pandas as pd
+import pyarrow as pa
+import zstandard
+
+MAGIC_V1 = b"MAA\x01"
+MAGIC = b"MAA\x02"
+
+FORMAT_ARROW = b"A"
+FORMAT_MSGPACK = b"M"
+FORMAT_PICKLE = b"P"
+FORMAT_CHUNKED = b"C"
+FORMAT_REF = b"R"
+FORMAT_SPILL = b"S"
+FORMAT_VIEW = b"V"
+
+CODEC_NONE = 0
+CODEC_ZSTD = 1
+CODEC_LZ4 = 2
+
+CODEC_NAMES = {CODEC_NONE: "none", CODEC_ZSTD: "zstd", CODEC_LZ4: "lz4"}
+
+_FORMAT_CODECS = {
+    FORMAT_ARROW: CODEC_ZSTD,
+    FORMAT_PICKLE: CODEC_ZSTD,
+    FORMAT_MSGPACK: CODEC_LZ4,
+    FORMAT_CHUNKED: CODEC_NONE,
+    FORMAT_REF: CODEC_NONE,
+    FORMAT_SPILL: CODEC_NONE,
+    FORMAT_VIEW: CODEC_NONE,
+}
+
+_HEADER = struct.Struct("<4sccQ")
+HEADER_LEN = _HEADER.size
+_HEADER_V1_LEN = len(MAGIC_V1) + 1
+
+# Keep the compressed body only if it saves at least this much.
+_MIN_SAVING = 0.9
+
+ZSTD_LEVEL = 3
+
+# Only exact built-in types go through msgpack; anything that would not
+# round-trip unchanged (datetimes, tuples, subclasses, numpy scalars...)
+# is handed to `_reject` and the object falls back to pickle.
+_MSGPACK_OPTS = (
+    ormsgpack.OPT_PASSTHROUGH_BIG_INT
+    | ormsgpack.OPT_PASSTHROUGH_DATACLASS
+    | ormsgpack.OPT_PASSTHROUGH_DATETIME
+    | ormsgpack.OPT_PASSTHROUGH_ENUM
+    | ormsgpack.OPT_PASSTHROUGH_SUBCLASS
+    | ormsgpack.OPT_PASSTHROUGH_TUPLE
+    | ormsgpack.OPT_PASSTHROUGH_UUID
+)
+
+
+class Header(NamedTuple):
+    format: bytes
+    codec: int
+    raw_len: int
+    offset: int
+
+
+def _reject(obj):
+    raise TypeError(f"{type(obj).__name__} is not msgpack-native")
+
+
+def _arrow_compatible(df: pd.DataFrame) -> bool:
+    columns = df.columns
+    return (
+        not isinstance(columns, pd.MultiIndex)
+        and columns.is_unique
+        and all(isinstance(c, str) for c in columns)
+    )
+
+
+def dataframe_to_arrow(df: pd.DataFrame) -> Optional[pa.Table]:
+    """
+    Convert a DataFrame to an Arrow table, or None if it cannot be
+    represented losslessly (mixed-type object columns, non-str labels...).
+    """
+    if not _arrow_compatible(df):
+        return None
+    try:
+        return pa.Table.from_pandas(df)
+    except (pa.ArrowException, TypeError, ValueError):
+        return None
+
+
+def _compress(codec: int, body) -> bytes:
+    if codec == CODEC_ZSTD:
+        return zstandard.compress(body, ZSTD_LEVEL)
+    if codec == CODEC_LZ4:
+        return lz4.frame.compress(body)
+    raise ValueError(f"Unknown codec {codec}")
+
+
+def _decompress(codec: int, body) -> bytes:
+    if codec == CODEC_ZSTD:
+        return zstandard.decompress(body)
+    if codec == CODEC_LZ4:
+        return lz4.frame.decompress(body)
+    raise ValueError(f"Unknown codec {codec}")
+
+
+def frame(fmt: bytes, body, compress_min_bytes: Optional[int] = None) -> bytes:
+    """
+    Prefix a serialized body with its header, compressing it first when it
+    is at least `compress_min_bytes` long and compression actually helps.
+    """
+    raw_len = len(body)
+    codec = _FORMAT_CODECS[fmt]
+
+    if codec != CODEC_NONE and compress_min_bytes is not None and raw_len >= compress_min_bytes:
+        packed = _compress(codec, body)
+        if len(packed) < raw_len * _MIN_SAVING:
+            return _HEADER.pack(MAGIC, fmt, bytes([codec]), raw_len) + packed
+
+    return _HEADER.pack(MAGIC, fmt, bytes([CODEC_NONE]), raw_len) + body
+
+
+def _arrow_body(table: pa.Table) -> pa.Buffer:
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue()
+
+
+def encode_table(table: pa.Table, compress_min_bytes: Optional[int] = None) -> bytes:
+    """
+    Serialize an Arrow table (e.g. from `dataframe_to_arrow`) into a blob.
+    """
+    return frame(FORMAT_ARROW, _arrow_body(table), compress_min_bytes)
+
+
+def encode(obj: Any, compress_min_bytes: Optional[int] = None) -> bytes:
+    """
+    Serialize an object into a tagged blob.
+    """
+    if isinstance(obj, pd.DataFrame):
+        table = dataframe_to_arrow(obj)
+        if table is not None:
+            return encode_table(table, compress_min_bytes)
+
+    elif type(obj) in (dict, list):
+        try:
+            body = ormsgpack.packb(obj, default=_reject, option=_MSGPACK_OPTS)
+            return frame(FORMAT_MSGPACK, body, compress_min_bytes)
+        except TypeError:
+            pass
+
+    body = pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+    return frame(FORMAT_PICKLE, body, compress_min_bytes)
+
+
+def read_header(payload: bytes) -> Optional[Header]:
+    """
+    Parse the header of a blob, or return None for legacy untagged pickles.
+    """
+    magic = payload[:len(MAGIC)]
+    if magic == MAGIC:
+        _, fmt, codec, raw_len = _HEADER.unpack_from(payload)
+        return Header(fmt, codec[0], raw_len, HEADER_LEN)
+    if magic == MAGIC_V1:
+        fmt = payload[len(MAGIC_V1):_HEADER_V1_LEN]
+        return Header(fmt, CODEC_NONE, len(payload) - _HEADER_V1_LEN, _HEADER_V1_LEN)
+    return None
+
+
+def read_format(payload: bytes) -> Optional[bytes]:
+    """
+    Return the format tag of a blob, or None for legacy untagged pickles.
+    """
+    header = read_header(payload)
+    return header.format if header else None
+
+
+def _body(payload: bytes, header: Header) -> pa.Buffer:
+    # Uncompressed bodies are sliced out of the payload without copying.
+    if header.codec == CODEC_NONE:
+        return pa.py_buffer(payload)[header.offset:]
+    return pa.py_buffer(_decompress(header.codec, memoryview(payload)[header.offset:]))
+
+
+def arrow_table_from_body(payload: bytes) -> pa.Table:
+    """
+    Read the Arrow table of a FORMAT_ARROW blob. Uncompressed bodies are
+    read in place; compressed ones are decompressed once and read in place.
+    """
+    return pa.ipc.open_stream(_body(payload, read_header(payload))).read_all()
+
+
+def _is_string(t: pa.DataType) -> bool:
+    return pa.types.is_string(t) or pa.types.is_large_string(t)
+
+
+def batch_to_arrow(df: pd.DataFrame, schema: Optional[pa.Schema] = None) -> Tuple[pa.Table, List[str]]:
+    """
+    Convert one row batch of a larger table to Arrow, cast to the `schema`
+    of the batches before it. Returns (table, retyped): columns that were
+    all-null so far take the batch's type, and columns whose values cannot
+    be cast are widened to string. `table.schema` is the schema to use from
+    now on; earlier batches must be cast to it for the `retyped` columns.
+    """
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    if schema is None:
+        return table, []
+    if table.schema.names != schema.names:
+        raise ValueError(f"Row batch columns {table.schema.names} do not match {schema.names}")
+
+    pandas_meta = schema.pandas_metadata
+    batch_columns = table.schema.pandas_metadata["columns"]
+    arrays, fields, retyped = [], [], []
+    for i, field in enumerate(schema):
+        column = table.column(i)
+        if column.type != field.type:
+            if pa.types.is_null(field.type):
+                field = table.schema.field(i)
+                retyped.append(field.name)
+            else:
+                try:
+                    column = column.cast(field.type)
+                except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+                    string_type = column.type if _is_string(column.type) else pa.string()
+                    column = column.cast(string_type)
+                    field = pa.field(field.name, string_type)
+                    retyped.append(field.name)
+            if field.name in retyped:
+                pandas_meta["columns"][i] = batch_columns[i] if column.type == table.schema.field(i).type else {
+                    **batch_columns[i], "pandas_type": "unicode", "numpy_type": "object",
+                }
+        arrays.append(column)
+        fields.append(field)
+
+    metadata = schema.metadata
+    if retyped:
+        metadata = {**metadata, b"pandas": orjson.dumps(pandas_meta)}
+    return pa.Table.from_arrays(arrays, schema=pa.schema(fields, metadata=metadata)), retyped
+
+
+def arrow_to_dataframe(table: pa.Table) -> pd.DataFrame:
+    # split_blocks lets numeric columns without nulls share the Arrow
+    # buffers instead of being consolidated into fresh 2D blocks.
+    return table.to_pandas(split_blocks=True)
+
+
+def iter_chunks(
+    table: pa.Table,
+    chunk_rows: int,
+    compress_min_bytes: Optional[int] = None,
+) -> Iterator[Tuple[int, int, bytes]]:
+    """
+    Split an Arrow table into (column_index, row_group_index, blob) chunks.
+    Chunks carry no pandas metadata; that lives once in the manifest.
+    """
+    for col_idx, field in enumerate(table.schema):
+        column = table.column(col_idx)
+        chunk_schema = pa.schema([field])
+        for rg_idx, (start, stop) in enumerate(row_group_bounds(table.num_rows, chunk_rows)):
+            part = pa.Table.from_arrays([column.slice(start, stop - start)], schema=chunk_schema)
+            yield col_idx, rg_idx, frame(FORMAT_ARROW, _arrow_body(part), compress_min_bytes)
+
+
+def iter_ipc_stream(table: pa.Table, batch_rows: int) -> Iterator[bytes]:
+    """
+    Serialize a table as an Arrow IPC stream, one record batch at a time,
+    without first building the whole stream in memory.
+    """
+    sink = io.BytesIO()
+
+    def drain() -> bytes:
+        data = sink.getvalue()
+        sink.seek(0)
+        sink.truncate()
+        return data
+
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        for batch in table.to_batches(max_chunksize=batch_rows):
+            writer.write_batch(batch)
+            yield drain()
+    yield drain()
+
+
+def row_group_bounds(num_rows: int, chunk_rows: int) -> List[List[int]]:
+    bounds = [
+        [start, min(start + chunk_rows, num_rows)]
+        for start in range(0, num_rows, chunk_rows)
+    ]
+    return bounds or [[0, 0]]
+
+
+def encode_manifest(schema: pa.Schema, row_groups: List[List[int]], nbytes: int) -> bytes:
+    return frame(FORMAT_CHUNKED, ormsgpack.packb({
+        "num_rows": row_groups[-1][1],
+        "columns": schema.names,
+        "row_groups": row_groups,
+        "schema": schema.serialize().to_pybytes(),
+        "nbytes": nbytes,
+    }))
+
+
+def decode_manifest(payload: bytes) -> Dict[str, Any]:
+    manifest = ormsgpack.unpackb(memoryview(_body(payload, read_header(payload))))
+    manifest["schema"] = pa.ipc.read_schema(pa.py_buffer(manifest["schema"]))
+    return manifest
+
+
+def index_columns(schema: pa.Schema) -> List[str]:
+    """
+    Names of the Arrow columns that hold the pandas index.
+    """
+    pandas_meta = schema.pandas_metadata or {}
+    return [c for c in pandas_meta.get("index_columns", []) if isinstance(c, str)]
+
+
+def assemble_chunks(
+    manifest: Dict[str, Any],
+    columns: List[str],
+    row_groups: List[int],
+    blobs: List[bytes],
+) -> pa.Table:
+    """
+    Rebuild a table from chunk blobs fetched column-major:
+    blobs[i * len(row_groups) + j] is column i, row group j.
+    """
+    schema = manifest["schema"]
+    per_column = len(row_groups)
+    arrays = []
+    for i, name in enumerate(columns):
+        parts = [
+            arrow_table_from_body(blob).column(0)
+            for blob in blobs[i * per_column:(i + 1) * per_column]
+        ]
+        arrays.append(pa.chunked_array(
+            [chunk for part in parts for chunk in part.chunks],
+            type=schema.field(name).type,
+        ))
+
+    fields = [schema.field(name) for name in columns]
+    return pa.Table.from_arrays(arrays, schema=pa.schema(fields, metadata=schema.metadata))
+
+
+def content_hash(payload: bytes) -> str:
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+def encode_ref(digest: str) -> bytes:
+    return frame(FORMAT_REF, digest.encode())
+
+
+def decode_ref(payload: bytes) -> str:
+    return bytes(_body(payload, read_header(payload))).decode()
+
+
+def encode_spill(path: str, nbytes: int) -> bytes:
+    return frame(FORMAT_SPILL, ormsgpack.packb({"path": path, "nbytes": nbytes}))
+
+
+def decode_spill(payload: bytes) -> Dict[str, Any]:
+    return ormsgpack.unpackb(memoryview(_body(payload, read_header(payload))))
+
+
+def encode_view(parent: str, columns: Optional[List[str]], rows: Optional[range]) -> bytes:
+    return frame(FORMAT_VIEW, ormsgpack.packb({
+        "parent": parent,
+        "columns": columns,
+        "rows": [rows.start, rows.stop, rows.step] if rows is not None else None,
+    }))
+
+
+def decode_view(payload: bytes) -> Dict[str, Any]:
+    view = ormsgpack.unpackb(memoryview(_body(payload, read_header(payload))))
+    if view["rows"] is not None:
+        view["rows"] = range(*view["rows"])
+    return view
+
+
+def decode(payload: bytes) -> Any:
+    """
+    Deserialize a blob produced by `encode` (or a legacy pickle).
+    """
+    header = read_header(payload)
+
+    if header is None:
+        return pickle.loads(payload)
+
+    if header.format == FORMAT_ARROW:
+        return arrow_to_dataframe(arrow_table_from_body(payload))
+
+    body = _body(payload, header)
+
+    if header.format == FORMAT_MSGPACK:
+        return ormsgpack.unpackb(memoryview(body))
+
+    if header.format == FORMAT_PICKLE:
+        return pickle.loads(memoryview(body))
+
+    raise ValueError(f"Unknown object format tag {header.format!r}")
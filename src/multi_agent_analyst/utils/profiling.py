@@ -0,0 +1,211 @@
+"""
+Column profiles computed at upload time.
+
+Profiles are built from mergeable sketches, so a table can be profiled one
+batch at a time in bounded memory:
+
+  - distinct count: K-Minimum-Values over 64-bit value hashes (exact
+    below KMV_K distinct values, ~2% error above)
+  - quantiles: a bottom-k sample by random priority, i.e. a uniform sample
+    of at most SAMPLE_SIZE values
+  - top values: per-batch value counts merged and pruned to TOP_CANDIDATES
+    (exact unless a column has more distinct values than that)
+
+All sketch updates work on whole columns with numpy / pandas.
+"""
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.multi_agent_analyst.utils.json_encoding import to_jsonable
+
+KMV_K = 2048
+SAMPLE_SIZE = 10_000
+TOP_K = 5
+TOP_CANDIDATES = 200
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+# Longest top value quoted in a catalog summary
+SUMMARY_VALUE_CHARS = 40
+# Top values are left out of summaries of columns at least this unique
+# (distinct / non-null values), e.g. IDs, where each appears about once
+UNIQUE_FRACTION = 0.9
+
+_HASH_SPACE = float(2 ** 64)
+
+
+def _kind(series: pd.Series) -> str:
+    if pd.api.types.is_bool_dtype(series):
+        return "boolean"
+    if pd.api.types.is_numeric_dtype(series):
+        return "numeric"
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return "datetime"
+    return "text"
+
+
+def _smallest(values: np.ndarray, k: int) -> np.ndarray:
+    if len(values) <= k:
+        return values
+    return np.partition(values, k - 1)[:k]
+
+
+def _kmv_merge(sketch: np.ndarray, hashes: np.ndarray) -> np.ndarray:
+    """
+    The KMV_K smallest distinct hashes of `sketch` (sorted) and `hashes`.
+    Only a small partition of the batch is deduplicated unless the column
+    has few distinct values, where deduplicating everything is cheap.
+    """
+    if len(sketch) == KMV_K:
+        hashes = hashes[hashes < sketch[-1]]
+    candidates = pd.unique(_smallest(hashes, 4 * KMV_K))
+    if len(candidates) < KMV_K and len(hashes) > 4 * KMV_K:
+        candidates = pd.unique(hashes)
+    return np.sort(pd.unique(np.concatenate([sketch, candidates])))[:KMV_K]
+
+
+class _ColumnSketch:
+    def __init__(self, kind: str, rng: np.random.Generator):
+        self.kind = kind
+        self.rng = rng
+        self.rows = 0
+        self.nulls = 0
+        self.min = None
+        self.max = None
+        self.hashes = np.empty(0, dtype=np.uint64)
+        self.sample = pd.Series(dtype=object)
+        self.sample_keys = np.empty(0)
+        self.counts = pd.Series(dtype="int64")
+
+    def update(self, series: pd.Series) -> None:
+        self.rows += len(series)
+        values = series.dropna()
+        self.nulls += len(series) - len(values)
+        if values.empty:
+            return
+
+        hashes = pd.util.hash_pandas_object(values, index=False).to_numpy()
+        self.hashes = _kmv_merge(self.hashes, hashes)
+
+        if self.kind in ("numeric", "datetime"):
+            lo, hi = values.min(), values.max()
+            self.min = lo if self.min is None else min(self.min, lo)
+            self.max = hi if self.max is None else max(self.max, hi)
+
+            keys = np.concatenate([self.sample_keys, self.rng.random(len(values))])
+            pool = pd.concat([self.sample, values], ignore_index=True) if len(self.sample) else values.reset_index(drop=True)
+            if len(keys) > SAMPLE_SIZE:
+                keep = np.argpartition(keys, SAMPLE_SIZE - 1)[:SAMPLE_SIZE]
+                keys, pool = keys[keep], pool.iloc[keep].reset_index(drop=True)
+            self.sample_keys, self.sample = keys, pool
+        else:
+            counts = values.value_counts()
+            counts.index = counts.index.astype(str)
+            merged = self.counts.add(counts, fill_value=0) if len(self.counts) else counts
+            self.counts = merged.nlargest(TOP_CANDIDATES)
+
+    def converted(self, kind: str) -> "_ColumnSketch":
+        """
+        This sketch carried over to a column widened mid-stream to `kind`
+        (e.g. numeric -> text). Earlier values come along as strings from
+        the retained sample (numeric, datetime) or value counts (text,
+        boolean): exact while the column had no more values than those
+        hold, scaled from the sample beyond that.
+        """
+        fresh = _ColumnSketch(kind, self.rng)
+        fresh.rows, fresh.nulls = self.rows, self.nulls
+        if kind != "text":
+            return fresh
+
+        if self.kind in ("numeric", "datetime"):
+            counts = self.sample.astype(str).value_counts()
+            if len(self.sample):
+                counts = (counts * ((self.rows - self.nulls) / len(self.sample))).round()
+        else:
+            counts = self.counts.copy()
+            counts.index = counts.index.astype(str)
+        if len(counts):
+            fresh.counts = counts.nlargest(TOP_CANDIDATES)
+            hashes = pd.util.hash_pandas_object(pd.Series(counts.index), index=False).to_numpy()
+            fresh.hashes = _kmv_merge(fresh.hashes, hashes)
+        return fresh
+
+    def distinct(self) -> int:
+        if len(self.hashes) < KMV_K:
+            return len(self.hashes)
+        kth = float(self.hashes.max()) / _HASH_SPACE
+        return int(round((KMV_K - 1) / kth))
+
+    def result(self) -> Dict[str, Any]:
+        profile: Dict[str, Any] = {
+            "kind": self.kind,
+            "null_fraction": round(self.nulls / self.rows, 4) if self.rows else 0.0,
+            "distinct": self.distinct(),
+            "values": self.rows - self.nulls,
+        }
+        if self.kind in ("numeric", "datetime") and self.min is not None:
+            profile["min"] = self.min
+            profile["max"] = self.max
+            sample = self.sample if self.kind == "datetime" else self.sample.astype("float64")
+            profile["quantiles"] = {
+                f"p{int(q * 100):02d}": value
+                for q, value in zip(QUANTILES, sample.quantile(list(QUANTILES)).tolist())
+            }
+        elif self.kind in ("text", "boolean"):
+            top = self.counts.nlargest(TOP_K)
+            profile["top_values"] = [[value, int(count)] for value, count in top.items()]
+        return profile
+
+
+class TableProfiler:
+    """
+    Incremental profile of a table: feed it DataFrame batches with `update`
+    and read per-column profiles (keyed by lowercased column name, as the
+    columns are named in Postgres) from `result`.
+    """
+    def __init__(self, seed: int = 0):
+        self.rng = np.random.default_rng(seed)
+        self.columns: Dict[str, _ColumnSketch] = {}
+
+    def update(self, df: pd.DataFrame) -> None:
+        for col in df.columns:
+            series = df[col]
+            name = str(col).lower()
+            kind = _kind(series)
+            sketch = self.columns.get(name)
+            if sketch is None:
+                sketch = self.columns[name] = _ColumnSketch(kind, self.rng)
+            elif sketch.kind != kind and series.notna().any():
+                # A column widened mid-stream (e.g. numeric -> text); an
+                # all-null batch says nothing about the column's type
+                sketch = self.columns[name] = sketch.converted(kind)
+            sketch.update(series)
+
+    def result(self) -> Dict[str, Dict[str, Any]]:
+        return to_jsonable({name: sketch.result() for name, sketch in self.columns.items()})
+
+
+def _clip(value: str) -> str:
+    if len(value) <= SUMMARY_VALUE_CHARS:
+        return value
+    return value[:SUMMARY_VALUE_CHARS - 3] + "..."
+
+
+def describe_profile(profile: Optional[Dict[str, Any]]) -> str:
+    """
+    One-line summary of a column profile for agent-facing catalogs.
+    """
+    if not profile:
+        return ""
+
+    parts: List[str] = []
+    if "min" in profile:
+        parts.append(f"range {profile['min']} to {profile['max']}")
+    values = profile.get("values")
+    mostly_unique = bool(values) and profile["distinct"] >= UNIQUE_FRACTION * values
+    if profile.get("top_values") and not mostly_unique:
+        parts.append("top " + ", ".join(_clip(str(v)) for v, _ in profile["top_values"]))
+    parts.append(f"~{profile['distinct']} distinct")
+    if profile.get("null_fraction"):
+        parts.append(f"{profile['null_fraction']:.0%} null")
+    return "; ".join(parts)
@@ -0,0 +1,52 @@
+"""
+Compact encoding of visualization series.
+
+A series becomes a small dict instead of a JSON list:
+
+    {"dtype": "float64" | "int32" | "datetime_ms", "data": <base64>}
+    {"dtype": "category", "categories": [...], "codes": <base64 int32>}
+
+`data` / `codes` are little-endian buffers the frontend wraps directly in
+Float64Array / Int32Array. Datetimes are float64 milliseconds since the
+epoch (NaT as NaN); category code -1 marks a missing label.
+"""
+import base64
+from typing import Any, Dict
+
+import numpy as np
+import pandas as pd
+
+_INT32 = np.iinfo(np.int32)
+
+
+def _b64(values: np.ndarray, dtype: str) -> str:
+    return base64.b64encode(np.ascontiguousarray(values, dtype=dtype).tobytes()).decode("ascii")
+
+
+def encode_array(values: Any) -> Dict[str, Any]:
+    """
+    Encode a list / array / Series of values for a visualization spec.
+    """
+    series = values if isinstance(values, pd.Series) else pd.Series(values)
+
+    if pd.api.types.is_bool_dtype(series) or not (
+        pd.api.types.is_numeric_dtype(series) or pd.api.types.is_datetime64_any_dtype(series)
+    ):
+        codes, categories = pd.factorize(series)
+        return {
+            "dtype": "category",
+            "categories": [str(c) for c in categories],
+            "codes": _b64(codes, "<i4"),
+        }
+
+    if pd.api.types.is_datetime64_any_dtype(series):
+        nanos = series.to_numpy(dtype="datetime64[ns]").astype("int64").astype("float64")
+        millis = np.where(series.isna().to_numpy(), np.nan, nanos / 1e6)
+        return {"dtype": "datetime_ms", "data": _b64(millis, "<f8")}
+
+    if pd.api.types.is_integer_dtype(series) and not series.hasnans and len(series):
+        data = series.to_numpy(dtype="int64")
+        if _INT32.min <= data.min() and data.max() <= _INT32.max:
+            return {"dtype": "int32", "data": _b64(data, "<i4")}
+
+    return {"dtype": "float64", "data": _b64(series.to_numpy(dtype="float64", na_value=np.nan), "<f8")}
@@ -1,25 +1,186 @@
 import uuid
-from typing import List, Optional, Dict, Any
+import itertools
+from typing import Iterable, List, Optional, Dict, Any, Tuple
 from pydantic import BaseModel
 import pandas as pd 
 import uuid
-import pickle
 from typing import Any
 import redis
+import redis.asyncio
+import asyncio
 import traceback
+import threading
+import time
+import os
+import pyarrow as pa
 from functools import wraps
 from src.multi_agent_analyst.logging import logger
 import numpy as np
 import pandas as pd
-from datetime import datetime
 from src.backend.config import settings
+from src.multi_agent_analyst.utils import object_codecs
+from src.multi_agent_analyst.utils.object_cache import ObjectCache
+from src.multi_agent_analyst.utils.json_encoding import to_jsonable
 import json 
-import math 
+import orjson
+
+META_SAMPLE_ROWS = 5
+
+VIEWS_KEY = "object_views"
+VIEW_MATERIALIZE_HORIZON_SECONDS = 5 * 60
+
+def build_object_metadata(obj: Any, nbytes: int) -> Dict[str, Any]:
+    """
+    Small description of a stored object, written next to the payload so
+    previews and validation never have to load the object itself.
+    """
+    meta: Dict[str, Any] = {"kind": type(obj).__name__, "nbytes": nbytes}
+
+    if isinstance(obj, pd.DataFrame):
+        meta.update({
+            "kind": "dataframe",
+            "shape": list(obj.shape),
+            "columns": [str(c) for c in obj.columns],
+            "dtypes": {str(c): str(t) for c, t in obj.dtypes.items()},
+            "null_counts": {str(c): int(n) for c, n in obj.isna().sum().items()},
+            "sample": to_jsonable(obj.head(META_SAMPLE_ROWS)),
+        })
+    elif isinstance(obj, (dict, list)):
+        meta["length"] = len(obj)
+
+    return meta
+
+def _view_metadata(parent_meta: Dict[str, Any], columns: Optional[List[str]], rows: Optional[range], nbytes: int) -> Dict[str, Any]:
+    """
+    Metadata of a view, derived from its parent's without loading data.
+    Null counts and the sample are only kept when they are still exact.
+    """
+    columns = columns if columns is not None else parent_meta["columns"]
+    meta = {
+        "kind": "dataframe",
+        "nbytes": nbytes,
+        "shape": [len(rows) if rows is not None else parent_meta["shape"][0], len(columns)],
+        "columns": columns,
+        "dtypes": {c: parent_meta["dtypes"][c] for c in columns},
+    }
+    if rows is None:
+        meta["null_counts"] = {c: parent_meta["null_counts"][c] for c in columns}
+    if rows is None or (rows.start == 0 and rows.step == 1):
+        sample = parent_meta["sample"][:len(rows) if rows is not None else None]
+        meta["sample"] = [{c: r[c] for c in columns} for r in sample]
+    else:
+        meta["sample"] = []
+    return meta
+
+def _project(obj: Any, columns: Optional[List[str]], rows: Optional[slice]) -> pd.DataFrame:
+    if not isinstance(obj, pd.DataFrame):
+        raise TypeError(f"Column/row selection requires a DataFrame, got {type(obj).__name__}")
+    if columns is not None:
+        obj = obj[list(columns)]
+    if rows is not None:
+        obj = obj.iloc[rows]
+    return obj
+
+_TABLE_FORMATS = (object_codecs.FORMAT_CHUNKED, object_codecs.FORMAT_SPILL)
+
+def _wanted_columns(obj_id: str, schema, columns: Optional[List[str]]) -> List[str]:
+    """
+    Arrow columns to read for a projection: the requested ones plus the
+    columns that hold the pandas index.
+    """
+    if columns is None:
+        return list(schema.names)
+
+    index_cols = object_codecs.index_columns(schema)
+    missing = [c for c in columns if c not in schema.names or c in index_cols]
+    if missing:
+        raise KeyError(f"Columns {missing} not found in object '{obj_id}'")
+    return list(columns) + [c for c in index_cols if c not in columns]
+
+def _compose_view(obj_id: str, view: dict, columns: Optional[List[str]], rows: Optional[slice]):
+    """
+    Translate a projection of a view into a projection of its parent.
+    """
+    if columns is None:
+        columns = view["columns"]
+    elif view["columns"] is not None:
+        missing = [c for c in columns if c not in view["columns"]]
+        if missing:
+            raise KeyError(f"Columns {missing} not found in object '{obj_id}'")
+
+    if view["rows"] is not None:
+        rows = _range_to_slice(view["rows"][rows or slice(None)])
+
+    return columns, rows
+
+def _range_to_slice(r: range) -> slice:
+    # A descending range may end at -1, which a slice would read as "last".
+    return slice(r.start, r.stop if r.stop >= 0 else None, r.step)
+
+def _arrow_slice(obj_id: str, payload: bytes, columns: Optional[List[str]], rows: Optional[slice]):
+    if object_codecs.read_format(payload) != object_codecs.FORMAT_ARROW:
+        raise TypeError(f"Object '{obj_id}' is not stored as an Arrow table")
+
+    table = object_codecs.arrow_table_from_body(payload)
+    table = table.select(_wanted_columns(obj_id, table.schema, columns))
+    start, stop, _ = (rows or slice(None)).indices(table.num_rows)
+    return table.slice(start, max(stop - start, 0))
+
+def _resident_nbytes(obj: Any, payload: bytes) -> int:
+    """
+    What a decoded object costs the process-local cache: its deep pandas
+    size for DataFrames, otherwise at least the uncompressed blob length.
+    """
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=True, deep=True).sum())
+    header = object_codecs.read_header(payload)
+    return max(len(payload), header.raw_len if header else 0)
+
+def _shift_range_index(df: pd.DataFrame, schema, start: int) -> None:
+    """
+    Arrow drops a stored RangeIndex when the table is sliced; restore it.
+    """
+    pandas_meta = schema.pandas_metadata or {}
+    for index in pandas_meta.get("index_columns", []):
+        if isinstance(index, dict) and index.get("kind") == "range":
+            first = index["start"] + start * index["step"]
+            df.index = pd.RangeIndex(first, first + len(df) * index["step"], index["step"], name=index["name"])
 
 class RedisObjectStore:
     """
     Redis-backed object store for intermediate artifacts.
     Used for DataFrames, analysis results, visualization specs, etc.
+
+    Objects are serialized through `object_codecs`: DataFrames as Arrow IPC,
+    plain dicts/lists as msgpack, anything else as pickle.
+
+    Stored objects are immutable, so reads go through a process-local LRU
+    cache; objects returned by `get` must not be mutated in place.
+
+    Every object has a metadata sidecar under `<obj_id>:meta` (shape,
+    dtypes, null counts, a small sample, payload size) with the same TTL.
+
+    DataFrames above OBJECT_CHUNK_THRESHOLD_MB are stored as per-column,
+    per-row-group chunks (`<obj_id>:chunk:<col>:<row_group>`) behind a
+    manifest, so readers can fetch only the columns and rows they need.
+
+    Payloads (and chunks) above OBJECT_COMPRESS_MIN_KB are compressed with
+    the codec `object_codecs` picks for their format.
+
+    DataFrames above OBJECT_SPILL_THRESHOLD_MB are written to a local Arrow
+    file under OBJECT_SPILL_DIR instead; Redis only keeps a pointer (with
+    the usual TTL) and reads memory-map the file.
+
+    `save_frames` writes a DataFrame that arrives in row batches straight
+    into chunked storage, one row group per batch.
+
+    Views (`save_view`) store only a parent id and a projection and are
+    resolved on read; they are materialized into full objects shortly
+    before their parent expires.
+
+    In content-addressed mode a payload is stored once under
+    `blob:<hash>`; object ids are aliases of it and `blob:<hash>:refs`
+    tracks which aliases are still alive.
     """
     def __init__(self):
         self.redis = redis.Redis(
@@ -28,28 +189,813 @@ class RedisObjectStore:
             db=settings.redis_app_db,
             decode_responses=False, 
         )
+        self.cache = ObjectCache(settings.object_cache_max_bytes)
+        self._compression = {}
+        self._compression_lock = threading.Lock()
 
-    def save(self, obj: Any, ttl: int = 3600) -> str:
+    def _record_write(self, payload: bytes) -> None:
+        header = object_codecs.read_header(payload)
+        codec = object_codecs.CODEC_NAMES[header.codec]
+        with self._compression_lock:
+            entry = self._compression.setdefault(codec, {"blobs": 0, "raw_bytes": 0, "stored_bytes": 0})
+            entry["blobs"] += 1
+            entry["raw_bytes"] += header.raw_len
+            entry["stored_bytes"] += len(payload)
+
+    def save(self, obj: Any, ttl: int = 3600, dedupe: Optional[bool] = None) -> str:
         """
         Save an object and return its object_id.
+
+        With `dedupe` (default: OBJECT_CONTENT_ADDRESSING) single-blob
+        payloads are stored once under their content hash and obj_id
+        becomes an alias of that blob. The blob lives as long as its
+        longest-lived alias.
+        """
+        if dedupe is None:
+            dedupe = settings.object_content_addressing
+
+        pipe = self.redis.pipeline(transaction=dedupe)
+        obj_id = self._queue_save(pipe, obj, ttl, dedupe)
+        pipe.execute()
+        return obj_id
+
+    def save_many(self, objs: List[Any], ttl: int = 3600, dedupe: Optional[bool] = None) -> List[str]:
+        """
+        Save several objects in one pipelined round-trip and return their
+        object_ids in the same order.
+        """
+        if dedupe is None:
+            dedupe = settings.object_content_addressing
+
+        pipe = self.redis.pipeline(transaction=dedupe)
+        obj_ids = [self._queue_save(pipe, obj, ttl, dedupe) for obj in objs]
+        pipe.execute()
+        return obj_ids
+
+    def save_frames(self, frames: Iterable[pd.DataFrame], ttl: int = 3600) -> Tuple[str, Dict[str, Any]]:
+        """
+        Save a DataFrame that arrives as a sequence of row batches (e.g. a
+        server-side cursor) and return (object_id, metadata).
+
+        Batches are buffered until they exceed OBJECT_CHUNK_THRESHOLD_MB; a
+        result that ends before that is saved like any other object. Larger
+        results are written as chunked storage one batch (= row group) at a
+        time, so memory stays bounded by the threshold plus one batch.
+
+        The Arrow schema is fixed by the first batch and later batches are
+        cast to it. A column whose values stop fitting is widened to string
+        (see `object_codecs.batch_to_arrow`), including the rows already
+        buffered or written.
         """
+        frames = iter(frames)
+        schema = None
+        buffered, size = [], 0
+        for df in frames:
+            table, retyped = object_codecs.batch_to_arrow(df, schema)
+            schema = table.schema
+            if retyped:
+                buffered = [t.cast(schema) for t in buffered]
+            buffered.append(table)
+            size += table.nbytes
+            if size > settings.object_chunk_threshold_bytes:
+                break
+        else:
+            table = pa.concat_tables(buffered) if len(buffered) > 1 else buffered[0]
+            obj_id = self.save(object_codecs.arrow_to_dataframe(table), ttl=ttl)
+            return obj_id, self.get_meta(obj_id)
+
         obj_id = f"obj_{uuid.uuid4().hex[:8]}"
-        payload = pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
-        self.redis.set(obj_id, payload, ex=ttl)
+        pipe = self.redis.pipeline(transaction=False)
+        # A copy, so the sample does not keep the whole first batch alive.
+        head = buffered[0].take(pa.array(range(min(META_SAMPLE_ROWS, buffered[0].num_rows))))
+        null_counts = [0] * len(schema)
+        row_groups: List[List[int]] = []
+        nbytes = pending = 0
+
+        def drain():
+            # Release buffered batches as soon as they are written.
+            while buffered:
+                yield buffered.pop(0), []
+
+        def convert():
+            nonlocal schema
+            for df in frames:
+                table, retyped = object_codecs.batch_to_arrow(df, schema)
+                schema = table.schema
+                yield table, retyped
+
+        for table, retyped in itertools.chain(drain(), convert()):
+            if retyped:
+                pipe.execute()
+                pending = 0
+                for name in retyped:
+                    nbytes += self._recast_chunks(obj_id, schema, name, len(row_groups), ttl)
+            if table.num_rows == 0:
+                continue
+
+            for i in range(len(schema)):
+                null_counts[i] += table.column(i).null_count
+
+            start = row_groups[-1][1] if row_groups else 0
+            row_groups.append([start, start + table.num_rows])
+            chunks = object_codecs.iter_chunks(
+                table, table.num_rows, settings.object_compress_min_bytes
+            )
+            for col_idx, _, blob in chunks:
+                self._record_write(blob)
+                pipe.set(self._chunk_key(obj_id, col_idx, len(row_groups) - 1), blob, ex=ttl)
+                nbytes += len(blob)
+                pending += len(blob)
+            if pending >= settings.object_chunk_threshold_bytes:
+                pipe.execute()
+                pending = 0
+
+        meta = build_object_metadata(object_codecs.arrow_to_dataframe(head.cast(schema)), nbytes)
+        meta["shape"][0] = row_groups[-1][1]
+        meta["null_counts"] = dict(zip(meta["columns"], null_counts))
+
+        # The manifest goes in last: until then the object does not exist.
+        pipe.set(obj_id, object_codecs.encode_manifest(schema, row_groups, nbytes), ex=ttl)
+        pipe.set(self._meta_key(obj_id), orjson.dumps(meta), ex=ttl)
+        pipe.execute()
+        return obj_id, meta
+
+    def _recast_chunks(self, obj_id: str, schema, name: str, num_row_groups: int, ttl: int) -> int:
+        """
+        Rewrite the already written chunks of one column with its type in
+        `schema`. Returns the change in stored bytes.
+        """
+        col_idx = schema.get_field_index(name)
+        chunk_schema = pa.schema([schema.field(col_idx)])
+        keys = [self._chunk_key(obj_id, col_idx, rg) for rg in range(num_row_groups)]
+
+        delta = 0
+        pipe = self.redis.pipeline(transaction=False)
+        for key, blob in zip(keys, self.redis.mget(keys) if keys else []):
+            part = object_codecs.arrow_table_from_body(blob).cast(chunk_schema)
+            _, _, new_blob = next(object_codecs.iter_chunks(
+                part, part.num_rows, settings.object_compress_min_bytes
+            ))
+            self._record_write(new_blob)
+            pipe.set(key, new_blob, ex=ttl)
+            delta += len(new_blob) - len(blob)
+        pipe.execute()
+        return delta
+
+    def _queue_save(
+        self,
+        pipe,
+        obj: Any,
+        ttl: int,
+        dedupe: bool,
+        obj_id: Optional[str] = None,
+        table: Optional[pa.Table] = None,
+    ) -> str:
+        """
+        Queue the writes for one object (payload, chunks or spill pointer,
+        plus its metadata sidecar) on `pipe` and return its object_id.
+        `table` is the object's Arrow table when the caller already has it.
+        """
+        obj_id = obj_id or f"obj_{uuid.uuid4().hex[:8]}"
+        digest = None
+
+        if table is None:
+            table = self._arrow_table(obj)
+        nbytes = table.nbytes if table is not None else 0
+
+        if nbytes > settings.object_spill_threshold_bytes:
+            nbytes = self._write_spill(pipe, obj_id, table, ttl)
+        elif nbytes > settings.object_chunk_threshold_bytes:
+            nbytes = self._write_chunks(pipe, obj_id, table, ttl)
+        else:
+            if table is not None:
+                payload = object_codecs.encode_table(table, settings.object_compress_min_bytes)
+            else:
+                payload = object_codecs.encode(obj, settings.object_compress_min_bytes)
+            self._record_write(payload)
+            nbytes = len(payload)
+            if dedupe:
+                digest = object_codecs.content_hash(payload)
+                self._write_alias(pipe, obj_id, digest, payload, ttl)
+            else:
+                pipe.set(obj_id, payload, ex=ttl)
+
+        meta = build_object_metadata(obj, nbytes)
+        if digest is not None:
+            meta["content_hash"] = digest
+        pipe.set(self._meta_key(obj_id), orjson.dumps(meta), ex=ttl)
         return obj_id
 
-    def get(self, obj_id: str) -> Any:
+    def save_view(
+        self,
+        parent_id: str,
+        columns: Optional[List[str]] = None,
+        rows: Optional[slice] = None,
+        ttl: int = 3600,
+    ) -> str:
         """
-        Retrieve an object by object_id.
+        Save a lazy projection of a stored DataFrame and return its
+        object_id. Only (parent_id, columns, rows) is written; reads resolve
+        it against the parent. A view of a view points at the original
+        parent directly.
+        """
+        if rows is not None and rows.step is not None and rows.step < 0:
+            raise ValueError("Views only support ascending row ranges")
+
+        payload = self.redis.get(parent_id)
+        if payload is None:
+            raise KeyError(f"Object '{parent_id}' not found in Redis")
+
+        if object_codecs.read_format(payload) == object_codecs.FORMAT_VIEW:
+            view = object_codecs.decode_view(payload)
+            columns, rows = _compose_view(parent_id, view, columns, rows)
+            parent_id = view["parent"]
+
+        parent_meta = self.get_meta(parent_id)
+        if parent_meta["kind"] != "dataframe":
+            raise TypeError(f"Views require a DataFrame, got {parent_meta['kind']}")
+
+        missing = [c for c in (columns or []) if c not in parent_meta["columns"]]
+        if missing:
+            raise KeyError(f"Columns {missing} not found in object '{parent_id}'")
+
+        row_range = range(parent_meta["shape"][0])[rows] if rows is not None else None
+        obj_id = f"obj_{uuid.uuid4().hex[:8]}"
+        view_payload = object_codecs.encode_view(parent_id, columns, row_range)
+        meta = _view_metadata(parent_meta, columns, row_range, len(view_payload))
+        meta["parent"] = parent_id
+
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.set(obj_id, view_payload, ex=ttl)
+        pipe.set(self._meta_key(obj_id), orjson.dumps(meta), ex=ttl)
+        pipe.ttl(parent_id)
+        parent_ttl = pipe.execute()[-1]
+
+        self.redis.zadd(VIEWS_KEY, {obj_id: time.time() + max(parent_ttl, 0)})
+        self.materialize_expiring_views()
+        return obj_id
+
+    def materialize_expiring_views(self, horizon_seconds: int = VIEW_MATERIALIZE_HORIZON_SECONDS) -> int:
+        """
+        Turn views whose parent expires within `horizon_seconds` into full
+        objects under the same object_id (keeping the view's own TTL).
+        """
+        view_ids = [
+            v.decode() for v in
+            self.redis.zrangebyscore(VIEWS_KEY, "-inf", time.time() + horizon_seconds)
+        ]
+
+        materialized = 0
+        for view_id in view_ids:
+            try:
+                ttl = self.redis.ttl(view_id)
+                payload = self.redis.get(view_id)
+                if payload is not None and object_codecs.read_format(payload) == object_codecs.FORMAT_VIEW and ttl > 0:
+                    obj = self.get(view_id)
+                    pipe = self.redis.pipeline(transaction=False)
+                    self._queue_save(pipe, obj, ttl, False, obj_id=view_id)
+                    pipe.execute()
+                    self.cache.discard(("meta", view_id))
+                    materialized += 1
+            except KeyError:
+                logger.warning("View parent expired before materialization", extra={"object_id": view_id})
+            self.redis.zrem(VIEWS_KEY, view_id)
+
+        return materialized
+
+    @staticmethod
+    def _blob_key(digest: str) -> str:
+        return f"blob:{digest}"
+
+    @staticmethod
+    def _refs_key(digest: str) -> str:
+        return f"blob:{digest}:refs"
+
+    def _write_alias(self, pipe, obj_id: str, digest: str, payload: bytes, ttl: int) -> None:
+        """
+        Queue (inside a MULTI) the shared blob, its reference set and the
+        alias. `refs` maps alias -> expiry timestamp; the blob and the set
+        only ever have their TTL extended, never shortened.
+        """
+        blob_key = self._blob_key(digest)
+        refs_key = self._refs_key(digest)
+        expires_at = time.time() + ttl
+
+        pipe.set(blob_key, payload, ex=ttl, nx=True)
+        pipe.expire(blob_key, ttl, gt=True)
+        pipe.zadd(refs_key, {obj_id: expires_at})
+        pipe.zremrangebyscore(refs_key, "-inf", time.time())
+        pipe.expire(refs_key, ttl, nx=True)
+        pipe.expire(refs_key, ttl, gt=True)
+        pipe.set(obj_id, object_codecs.encode_ref(digest), ex=ttl)
+
+    def delete(self, obj_id: str) -> None:
+        """
+        Delete an object, its sidecar and chunks. A shared blob is only
+        deleted once no live alias references it any more.
+        """
+        self.cache.discard(obj_id)
+        self.cache.discard(("meta", obj_id))
+
+        payload = self.redis.get(obj_id)
+        keys = [obj_id, self._meta_key(obj_id)]
+        fmt = object_codecs.read_format(payload) if payload is not None else None
+
+        if fmt == object_codecs.FORMAT_CHUNKED:
+            manifest = object_codecs.decode_manifest(payload)
+            keys += [
+                self._chunk_key(obj_id, col_idx, rg_idx)
+                for col_idx in range(len(manifest["columns"]))
+                for rg_idx in range(len(manifest["row_groups"]))
+            ]
+        elif fmt == object_codecs.FORMAT_REF:
+            self._release_alias(obj_id, object_codecs.decode_ref(payload))
+        elif fmt == object_codecs.FORMAT_VIEW:
+            self.redis.zrem(VIEWS_KEY, obj_id)
+        elif fmt == object_codecs.FORMAT_SPILL:
+            try:
+                os.remove(object_codecs.decode_spill(payload)["path"])
+            except FileNotFoundError:
+                pass
+
+        self.redis.delete(*keys)
+
+    def _release_alias(self, obj_id: str, digest: str) -> None:
+        refs_key = self._refs_key(digest)
+
+        def release(pipe):
+            now = time.time()
+            live = pipe.zcount(refs_key, now, "+inf")
+            score = pipe.zscore(refs_key, obj_id)
+            if score is not None and score > now:
+                live -= 1
+            pipe.multi()
+            pipe.zrem(refs_key, obj_id)
+            if live <= 0:
+                pipe.delete(self._blob_key(digest), refs_key)
+
+        self.redis.transaction(release, refs_key)
+
+    @staticmethod
+    def _meta_key(obj_id: str) -> str:
+        return f"{obj_id}:meta"
+
+    @staticmethod
+    def _chunk_key(obj_id: str, col_idx: int, rg_idx: int) -> str:
+        return f"{obj_id}:chunk:{col_idx}:{rg_idx}"
+
+    @staticmethod
+    def _arrow_table(obj: Any) -> Optional[pa.Table]:
+        """
+        Arrow table of a DataFrame, or None for other objects and frames
+        Arrow cannot hold. Its nbytes is what the chunk and spill
+        thresholds are compared against: unlike a shallow memory_usage it
+        counts string data.
+        """
+        if not isinstance(obj, pd.DataFrame):
+            return None
+        return object_codecs.dataframe_to_arrow(obj)
+
+    def _spill_path(self, obj_id: str) -> str:
+        return os.path.join(settings.object_spill_dir, f"{obj_id}.arrow")
+
+    def _write_spill(self, pipe, obj_id: str, table, ttl: int) -> int:
+        """
+        Write the table to a local Arrow IPC file and queue a pointer to it.
+        The file is uncompressed so readers can memory-map it; it is removed
+        by `purge_spilled` once the pointer key has expired.
+        """
+        os.makedirs(settings.object_spill_dir, exist_ok=True)
+        path = self._spill_path(obj_id)
+        tmp_path = f"{path}.tmp"
+
+        with pa.OSFile(tmp_path, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table, max_chunksize=settings.object_chunk_rows)
+        os.replace(tmp_path, path)
+
+        nbytes = os.path.getsize(path)
+        pipe.set(obj_id, object_codecs.encode_spill(path, nbytes), ex=ttl)
+
+        self.purge_spilled()
+        return nbytes
+
+    def purge_spilled(self, grace_seconds: int = 60) -> int:
+        """
+        Delete spill files whose pointer key has expired (TTL semantics are
+        owned by Redis). Files younger than `grace_seconds` are kept so a
+        spill that is still being written is never removed.
+        """
+        try:
+            names = [n for n in os.listdir(settings.object_spill_dir) if n.endswith(".arrow")]
+        except FileNotFoundError:
+            return 0
+
+        obj_ids = [n[:-len(".arrow")] for n in names]
+        pipe = self.redis.pipeline(transaction=False)
+        for obj_id in obj_ids:
+            pipe.exists(obj_id)
+        alive = pipe.execute()
+
+        removed = 0
+        cutoff = time.time() - grace_seconds
+        for obj_id, exists in zip(obj_ids, alive):
+            path = self._spill_path(obj_id)
+            try:
+                if not exists and os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+                    removed += 1
+            except FileNotFoundError:
+                pass
+        return removed
+
+    def _write_chunks(self, pipe, obj_id: str, table, ttl: int) -> int:
+        """
+        Queue one key per (column, row group) plus a manifest under obj_id.
+        The pipeline is flushed periodically so a large table is never
+        buffered in full on the client.
+        """
+        nbytes = 0
+        pending = 0
+        chunks = object_codecs.iter_chunks(
+            table, settings.object_chunk_rows, settings.object_compress_min_bytes
+        )
+        for col_idx, rg_idx, blob in chunks:
+            self._record_write(blob)
+            pipe.set(self._chunk_key(obj_id, col_idx, rg_idx), blob, ex=ttl)
+            nbytes += len(blob)
+            pending += len(blob)
+            if pending >= settings.object_chunk_threshold_bytes:
+                pipe.execute()
+                pending = 0
+
+        manifest = object_codecs.encode_manifest(
+            table.schema, object_codecs.row_group_bounds(table.num_rows, settings.object_chunk_rows), nbytes
+        )
+        pipe.set(obj_id, manifest, ex=ttl)
+        return nbytes
+
+    def _fetch(self, obj_id: str) -> bytes:
+        """
+        GET the stored payload of obj_id, following content-addressed aliases.
         """
         payload = self.redis.get(obj_id)
         if payload is None:
             raise KeyError(f"Object '{obj_id}' not found in Redis")
-        return pickle.loads(payload)
+
+        if object_codecs.read_format(payload) == object_codecs.FORMAT_REF:
+            payload = self.redis.get(self._blob_key(object_codecs.decode_ref(payload)))
+            if payload is None:
+                raise KeyError(f"Object '{obj_id}' points at an expired blob")
+
+        return payload
+
+    def get(self, obj_id: str, columns: Optional[List[str]] = None, rows: Optional[slice] = None) -> Any:
+        """
+        Retrieve an object by object_id.
+
+        For DataFrames, `columns` and `rows` restrict the result; chunked
+        and spilled objects then only read the columns / rows they touch.
+        """
+        projected = columns is not None or rows is not None
+
+        obj = self.cache.get(obj_id)
+        if obj is not None:
+            return _project(obj, columns, rows) if projected else obj
+
+        payload = self._fetch(obj_id)
+        fmt = object_codecs.read_format(payload)
+
+        if fmt == object_codecs.FORMAT_VIEW:
+            view = object_codecs.decode_view(payload)
+            return self.get(view["parent"], *_compose_view(obj_id, view, columns, rows))
+
+        if fmt in _TABLE_FORMATS:
+            table, start = self._read_table(obj_id, payload, columns, rows)
+            return self._table_result(obj_id, payload, table, start, columns, rows)
+
+        return self._decode_result(obj_id, payload, columns, rows)
+
+    def _table_result(self, obj_id: str, payload: bytes, table, start, columns, rows) -> pd.DataFrame:
+        obj = object_codecs.arrow_to_dataframe(table)
+        if start is None:
+            obj = obj.iloc[rows] if rows is not None else obj
+        else:
+            _shift_range_index(obj, table.schema, start)
+        if columns is None and rows is None:
+            self.cache.put(obj_id, obj, _resident_nbytes(obj, payload))
+        return obj
+
+    def _decode_result(self, obj_id: str, payload: bytes, columns, rows) -> Any:
+        obj = object_codecs.decode(payload)
+        self.cache.put(obj_id, obj, _resident_nbytes(obj, payload))
+        if columns is None and rows is None:
+            return obj
+        return _project(obj, columns, rows)
+
+    def get_many(self, obj_ids: List[str]) -> List[Any]:
+        """
+        Retrieve several objects, fetching every cache miss with a single
+        MGET (plus one more for content-addressed blobs). Raises KeyError
+        if any object is missing.
+        """
+        objs = [self.cache.get(obj_id) for obj_id in obj_ids]
+        misses = [i for i, obj in enumerate(objs) if obj is None]
+        if not misses:
+            return objs
+
+        payloads = self.redis.mget([obj_ids[i] for i in misses])
+        for i, payload in zip(misses, payloads):
+            if payload is None:
+                raise KeyError(f"Object '{obj_ids[i]}' not found in Redis")
+
+        refs = [
+            j for j, payload in enumerate(payloads)
+            if object_codecs.read_format(payload) == object_codecs.FORMAT_REF
+        ]
+        if refs:
+            blobs = self.redis.mget([
+                self._blob_key(object_codecs.decode_ref(payloads[j])) for j in refs
+            ])
+            for j, blob in zip(refs, blobs):
+                if blob is None:
+                    raise KeyError(f"Object '{obj_ids[misses[j]]}' points at an expired blob")
+                payloads[j] = blob
+
+        for i, payload in zip(misses, payloads):
+            obj_id = obj_ids[i]
+            fmt = object_codecs.read_format(payload)
+            if fmt == object_codecs.FORMAT_VIEW:
+                view = object_codecs.decode_view(payload)
+                objs[i] = self.get(view["parent"], *_compose_view(obj_id, view, None, None))
+            elif fmt in _TABLE_FORMATS:
+                table, _ = self._read_table(obj_id, payload, None, None)
+                objs[i] = object_codecs.arrow_to_dataframe(table)
+                self.cache.put(obj_id, objs[i], _resident_nbytes(objs[i], payload))
+            else:
+                objs[i] = object_codecs.decode(payload)
+                self.cache.put(obj_id, objs[i], _resident_nbytes(objs[i], payload))
+
+        return objs
+
+    def get_arrow(self, obj_id: str, columns: Optional[List[str]] = None, rows: Optional[slice] = None):
+        """
+        Retrieve a stored DataFrame as a pyarrow Table without converting
+        it to pandas. Spilled objects are memory-mapped, so the result can
+        be handed to Polars (`pl.from_arrow`) without copying.
+        """
+        if rows is not None and rows.step not in (None, 1):
+            raise ValueError("get_arrow only supports contiguous row ranges")
+
+        payload = self._fetch(obj_id)
+        fmt = object_codecs.read_format(payload)
+
+        if fmt == object_codecs.FORMAT_VIEW:
+            view = object_codecs.decode_view(payload)
+            return self.get_arrow(view["parent"], *_compose_view(obj_id, view, columns, rows))
+
+        if fmt in _TABLE_FORMATS:
+            table, _ = self._read_table(obj_id, payload, columns, rows)
+            return table
+
+        return _arrow_slice(obj_id, payload, columns, rows)
+
+    def _read_table(self, obj_id: str, payload: bytes, columns, rows):
+        """
+        Read a chunked or spilled object as an Arrow table restricted to
+        `columns` (plus index columns) and `rows`. Returns (table, start):
+        `start` is the first row of a contiguous slice, or None when the
+        full table was read and `rows` still has to be applied.
+        """
+        if object_codecs.read_format(payload) == object_codecs.FORMAT_SPILL:
+            return self._read_spilled(obj_id, payload, columns, rows)
+        return self._read_chunks(obj_id, object_codecs.decode_manifest(payload), columns, rows)
+
+    def _read_chunks(self, obj_id: str, manifest: dict, columns, rows):
+        plan = self._plan_chunks(obj_id, manifest, columns, rows)
+        return self._assemble_chunks(obj_id, manifest, plan, self.redis.mget(plan["keys"]))
+
+    def _plan_chunks(self, obj_id: str, manifest: dict, columns, rows) -> dict:
+        """
+        Work out which chunk keys a projection of a chunked object needs.
+        """
+        names = manifest["columns"]
+        wanted = _wanted_columns(obj_id, manifest["schema"], columns)
+
+        start, stop, step = (rows or slice(None)).indices(manifest["num_rows"])
+        bounds = manifest["row_groups"]
+        if step == 1:
+            row_groups = [i for i, (lo, hi) in enumerate(bounds) if lo < stop and hi > start] or [0]
+        else:
+            row_groups = list(range(len(bounds)))
+
+        keys = [
+            self._chunk_key(obj_id, names.index(name), rg)
+            for name in wanted
+            for rg in row_groups
+        ]
+        return {"columns": wanted, "row_groups": row_groups, "keys": keys, "range": (start, stop, step)}
+
+    def _assemble_chunks(self, obj_id: str, manifest: dict, plan: dict, blobs):
+        if any(b is None for b in blobs):
+            raise KeyError(f"Object '{obj_id}' has expired chunks")
+
+        row_groups = plan["row_groups"]
+        table = object_codecs.assemble_chunks(manifest, plan["columns"], row_groups, blobs)
+        start, stop, step = plan["range"]
+        if step != 1:
+            return table, None
+
+        offset = manifest["row_groups"][row_groups[0]][0]
+        return table.slice(start - offset, max(stop - start, 0)), start
+
+    def _read_spilled(self, obj_id: str, payload: bytes, columns, rows):
+        path = object_codecs.decode_spill(payload)["path"]
+        try:
+            table = pa.ipc.open_file(pa.memory_map(path)).read_all()
+        except FileNotFoundError:
+            raise KeyError(f"Object '{obj_id}' spill file is missing")
+
+        table = table.select(_wanted_columns(obj_id, table.schema, columns))
+        start, stop, step = (rows or slice(None)).indices(table.num_rows)
+        if step != 1:
+            return table, None
+        return table.slice(start, max(stop - start, 0)), start
+
+    def get_meta(self, obj_id: str) -> Dict[str, Any]:
+        """
+        Retrieve the metadata record of an object without loading it.
+        Objects saved before sidecars existed are described on the fly.
+        """
+        cache_key = ("meta", obj_id)
+        meta = self.cache.get(cache_key)
+        if meta is not None:
+            return meta
+
+        raw = self.redis.get(self._meta_key(obj_id))
+        if raw is None:
+            meta = build_object_metadata(self.get(obj_id), 0)
+        else:
+            meta = orjson.loads(raw)
+
+        self.cache.put(cache_key, meta, len(raw or b""))
+        return meta
+
+    def stats(self) -> dict:
+        with self._compression_lock:
+            compression = {
+                codec: {
+                    **entry,
+                    "ratio": round(entry["raw_bytes"] / entry["stored_bytes"], 3) if entry["stored_bytes"] else None,
+                }
+                for codec, entry in self._compression.items()
+            }
+        return {"cache": self.cache.stats(), "compression": compression}
 
 
 object_store = RedisObjectStore()
 
+class AsyncRedisObjectStore:
+    """
+    asyncio front-end of RedisObjectStore for the FastAPI event loop.
+
+    Redis I/O goes through `redis.asyncio`; decoding, encoding and spill
+    file access run in the default thread pool, so a large object never
+    blocks the loop. Shares the process-local cache with `store`.
+    """
+    def __init__(self, store: RedisObjectStore):
+        self.store = store
+        self.cache = store.cache
+        self.redis = redis.asyncio.Redis(
+            host=settings.redis_app_host,
+            port=settings.redis_app_port,
+            db=settings.redis_app_db,
+            decode_responses=False,
+        )
+
+    async def _fetch(self, obj_id: str) -> bytes:
+        payload = await self.redis.get(obj_id)
+        if payload is None:
+            raise KeyError(f"Object '{obj_id}' not found in Redis")
+
+        if object_codecs.read_format(payload) == object_codecs.FORMAT_REF:
+            payload = await self.redis.get(self.store._blob_key(object_codecs.decode_ref(payload)))
+            if payload is None:
+                raise KeyError(f"Object '{obj_id}' points at an expired blob")
+
+        return payload
+
+    async def get(self, obj_id: str, columns: Optional[List[str]] = None, rows: Optional[slice] = None) -> Any:
+        """
+        Retrieve an object by object_id; see RedisObjectStore.get.
+        """
+        obj = self.cache.get(obj_id)
+        if obj is not None:
+            if columns is None and rows is None:
+                return obj
+            return await asyncio.to_thread(_project, obj, columns, rows)
+
+        payload = await self._fetch(obj_id)
+        fmt = object_codecs.read_format(payload)
+
+        if fmt == object_codecs.FORMAT_VIEW:
+            view = object_codecs.decode_view(payload)
+            return await self.get(view["parent"], *_compose_view(obj_id, view, columns, rows))
+
+        if fmt == object_codecs.FORMAT_CHUNKED:
+            manifest = object_codecs.decode_manifest(payload)
+            plan = self.store._plan_chunks(obj_id, manifest, columns, rows)
+            blobs = await self.redis.mget(plan["keys"])
+            return await asyncio.to_thread(self._chunked_result, obj_id, payload, manifest, plan, blobs, columns, rows)
+
+        if fmt == object_codecs.FORMAT_SPILL:
+            return await asyncio.to_thread(self._spilled_result, obj_id, payload, columns, rows)
+
+        return await asyncio.to_thread(self.store._decode_result, obj_id, payload, columns, rows)
+
+    async def get_arrow(self, obj_id: str, columns: Optional[List[str]] = None, rows: Optional[slice] = None):
+        """
+        Retrieve a stored DataFrame as a pyarrow Table; see
+        RedisObjectStore.get_arrow.
+        """
+        if rows is not None and rows.step not in (None, 1):
+            raise ValueError("get_arrow only supports contiguous row ranges")
+
+        payload = await self._fetch(obj_id)
+        fmt = object_codecs.read_format(payload)
+
+        if fmt == object_codecs.FORMAT_VIEW:
+            view = object_codecs.decode_view(payload)
+            return await self.get_arrow(view["parent"], *_compose_view(obj_id, view, columns, rows))
+
+        if fmt == object_codecs.FORMAT_CHUNKED:
+            manifest = object_codecs.decode_manifest(payload)
+            plan = self.store._plan_chunks(obj_id, manifest, columns, rows)
+            blobs = await self.redis.mget(plan["keys"])
+            table, _ = await asyncio.to_thread(self.store._assemble_chunks, obj_id, manifest, plan, blobs)
+            return table
+
+        if fmt == object_codecs.FORMAT_SPILL:
+            table, _ = await asyncio.to_thread(self.store._read_spilled, obj_id, payload, columns, rows)
+            return table
+
+        return await asyncio.to_thread(_arrow_slice, obj_id, payload, columns, rows)
+
+    def _chunked_result(self, obj_id, payload, manifest, plan, blobs, columns, rows):
+        table, start = self.store._assemble_chunks(obj_id, manifest, plan, blobs)
+        return self.store._table_result(obj_id, payload, table, start, columns, rows)
+
+    def _spilled_result(self, obj_id, payload, columns, rows):
+        table, start = self.store._read_spilled(obj_id, payload, columns, rows)
+        return self.store._table_result(obj_id, payload, table, start, columns, rows)
+
+    async def ttl(self, obj_id: str) -> int:
+        """
+        Remaining lifetime of an object in seconds (negative if it has
+        none or does not exist).
+        """
+        return await self.redis.ttl(obj_id)
+
+    async def get_meta(self, obj_id: str) -> Dict[str, Any]:
+        cache_key = ("meta", obj_id)
+        meta = self.cache.get(cache_key)
+        if meta is not None:
+            return meta
+
+        raw = await self.redis.get(self.store._meta_key(obj_id))
+        if raw is None:
+            obj = await self.get(obj_id)
+            meta = await asyncio.to_thread(build_object_metadata, obj, 0)
+        else:
+            meta = orjson.loads(raw)
+
+        self.cache.put(cache_key, meta, len(raw or b""))
+        return meta
+
+    async def save(self, obj: Any, ttl: int = 3600, dedupe: Optional[bool] = None) -> str:
+        """
+        Save an object and return its object_id; see RedisObjectStore.save.
+        """
+        if dedupe is None:
+            dedupe = settings.object_content_addressing
+
+        table = await asyncio.to_thread(self.store._arrow_table, obj)
+
+        # Chunked and spilled writes flush in several steps; keep them on
+        # the sync client, off the loop.
+        if table is not None and table.nbytes > settings.object_chunk_threshold_bytes:
+            pipe = self.store.redis.pipeline(transaction=dedupe)
+            obj_id = await asyncio.to_thread(self.store._queue_save, pipe, obj, ttl, dedupe, None, table)
+            await asyncio.to_thread(pipe.execute)
+            return obj_id
+
+        pipe = self.redis.pipeline(transaction=dedupe)
+        obj_id = await asyncio.to_thread(self.store._queue_save, pipe, obj, ttl, dedupe, None, table)
+        await pipe.execute()
+        return obj_id
+
+async_object_store = AsyncRedisObjectStore(object_store)
+
 class CurrentToolContext:
     def __init__(self):
         self.dict={'DataAgent':{}, 'AnalysisAgent':{}, 'VisualizationAgent':{}}
@@ -79,18 +1025,33 @@ current_tables={}
 
 viz_json={}
 
-def load_and_validate_df(data_id):
+def validate_object(data_id):
+    """
+    Check that an object exists and is non-empty using only its metadata.
+    """
     try:
-        df = object_store.get(data_id)
+        meta = object_store.get_meta(data_id)
+    except KeyError:
+        return None, f"DATA_NOT_FOUND: object '{data_id}' does not exist"
     except Exception as e:
         return None, f"DATA_ACCESS_ERROR: {e}"
 
-    if df is None:
-        return None, f"DATA_NOT_FOUND: object '{data_id}' does not exist"
-
-    if len(df) == 0:
+    rows = meta["shape"][0] if "shape" in meta else meta.get("length")
+    if rows == 0:
         return None, f"DATA_EMPTY: object '{data_id}' is empty"
 
+    return meta, None
+
+def load_and_validate_df(data_id):
+    _, error = validate_object(data_id)
+    if error:
+        return None, error
+
+    try:
+        df = object_store.get(data_id)
+    except Exception as e:
+        return None, f"DATA_ACCESS_ERROR: {e}"
+
     return df, None
 
 def create_log(agent, exception, status, id,output_object_id, sub_query):
@@ -99,14 +1060,17 @@ def create_log(agent, exception, status, id,output_object_id, sub_query):
     return log
 
 def generate_data_preview(object_id):
-    df, error=load_and_validate_df(object_id)
+    meta, error=validate_object(object_id)
     if error:
         return {"exception":error}
-    
-    types_schema=df.dtypes.to_dict()
-    sample=df.head(3).to_dict(orient='records')
 
-    return f"Object {object_id} CONTEXT:\nColumns: {types_schema}\nSample: {sample}"
+    if meta["kind"] != "dataframe":
+        return f"Object {object_id} CONTEXT:\nType: {meta['kind']}"
+
+    types_schema=meta["dtypes"]
+    sample=meta["sample"][:3]
+
+    return f"Object {object_id} CONTEXT:\nShape: {tuple(meta['shape'])}\nColumns: {types_schema}\nSample: {sample}"
 
 
 def normalize_dataframe_types(df: pd.DataFrame) -> pd.DataFrame:
@@ -141,6 +1105,38 @@ def normalize_dataframe_types(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
+def conform_dataframe_types(df: pd.DataFrame, dtypes: Dict[str, Any]) -> pd.DataFrame:
+    """
+    Cast a row batch to the dtypes `normalize_dataframe_types` chose for
+    the first batch of the same result, so every batch agrees. A column
+    whose values do not fit becomes "string"; `dtypes` is updated so later
+    batches follow. A dtype of None (column only null so far) is inferred
+    from the first batch that has values.
+    """
+    df = df.copy()
+
+    for col, dtype in dtypes.items():
+        s = df[col]
+        if dtype is None:
+            if not s.isna().all():
+                df[col] = normalize_dataframe_types(df[[col]])[col]
+                dtypes[col] = df[col].dtype
+            continue
+        try:
+            if pd.api.types.is_datetime64_any_dtype(dtype):
+                converted = pd.to_datetime(s, errors="raise").astype(dtype)
+            elif pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype):
+                converted = pd.to_numeric(s, errors="raise").astype(dtype)
+            else:
+                converted = s.astype(dtype)
+        except (ValueError, TypeError):
+            converted = s.astype("string")
+            dtypes[col] = converted.dtype
+        df[col] = converted
+
+    return df
+
+
 def guarded(node_name: str):
     def deco(fn):
         @wraps(fn)
@@ -189,36 +1185,6 @@ def agent_success(object_id: str, summary: str):
         "exception": None,
     }
 
-def json_safe(obj):
-    if isinstance(obj, dict):
-        return {k: json_safe(v) for k, v in obj.items()}
-
-    if isinstance(obj, list):
-        return [json_safe(v) for v in obj]
-
-    if isinstance(obj, (np.integer,)):
-        return int(obj)
-
-    if isinstance(obj, (np.floating, float)):
-        val = float(obj)
-        if math.isnan(val) or math.isinf(val):
-            return None
-        return val
-
-    if isinstance(obj, (np.bool_, bool)):
-        return bool(obj)
-
-    if isinstance(obj, (pd.Timestamp, datetime)):
-        return obj.isoformat()
-
-    if obj is pd.NA or obj is None:
-        return None
-
-    if isinstance(obj, (int, str)):
-        return obj
-
-    return str(obj)
-
 def parse_tool_output(raw):
     if isinstance(raw, dict):
         return raw
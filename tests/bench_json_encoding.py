@@ -0,0 +1,95 @@
+# tests/bench_json_encoding.py
+#
+# Compares the orjson-based encoder with the recursive json_safe path it
+# replaced, on a DataFrame response and a visualization spec.
+#
+#   python -m tests.bench_json_encoding
+
+import json
+import math
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from src.multi_agent_analyst.utils.json_encoding import dumps
+
+
+def legacy_json_safe(obj):
+    if isinstance(obj, dict):
+        return {k: legacy_json_safe(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [legacy_json_safe(v) for v in obj]
+    if isinstance(obj, (np.integer,)):
+        return int(obj)
+    if isinstance(obj, (np.floating, float)):
+        val = float(obj)
+        if math.isnan(val) or math.isinf(val):
+            return None
+        return val
+    if isinstance(obj, (np.bool_, bool)):
+        return bool(obj)
+    if isinstance(obj, (pd.Timestamp, datetime)):
+        return obj.isoformat()
+    if obj is pd.NA or obj is None:
+        return None
+    if isinstance(obj, (int, str)):
+        return obj
+    return str(obj)
+
+
+def legacy_dataframe(df):
+    df = df.replace([np.inf, -np.inf], np.nan)
+    return json.dumps(legacy_json_safe(df.to_dict(orient="records"))).encode()
+
+
+def make_frame(rows):
+    rng = np.random.default_rng(0)
+    values = rng.normal(size=rows)
+    values[::97] = np.nan
+    values[::101] = np.inf
+    return pd.DataFrame({
+        "id": np.arange(rows),
+        "value": values,
+        "ratio": rng.random(rows),
+        "label": rng.choice(["north", "south", "east", "west"], rows),
+        "ts": pd.date_range("2024-01-01", periods=rows, freq="min"),
+    })
+
+
+def make_spec(points):
+    rng = np.random.default_rng(1)
+    return {
+        "type": "visualization",
+        "plot_type": "scatter",
+        "x": rng.normal(size=points).tolist(),
+        "y": rng.normal(size=points).tolist(),
+    }
+
+
+def best_of(fn, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def report(name, legacy, current):
+    print(f"{name:<28} legacy {legacy * 1000:9.1f} ms   orjson {current * 1000:9.1f} ms   x{legacy / current:5.1f}")
+
+
+if __name__ == "__main__":
+    for rows in (10_000, 100_000, 500_000):
+        df = make_frame(rows)
+        report(f"DataFrame {rows:,} rows", best_of(lambda: legacy_dataframe(df)), best_of(lambda: dumps(df)))
+
+    for points in (100_000, 1_000_000):
+        spec = make_spec(points)
+        report(
+            f"Scatter spec {points:,} pts",
+            best_of(lambda: json.dumps(legacy_json_safe(spec)).encode()),
+            best_of(lambda: dumps(spec)),
+        )